@@ -5,13 +5,12 @@ Async usage examples for YouTube Transcript Extractor
 
 import sys
 import os
-import asyncio
 import time
 
 # パッケージのパスを追加
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from youtube_transcript_extractor import AsyncYouTubeTranscriptExtractor
+from youtube_transcript_extractor import AsyncYouTubeTranscriptExtractor, run_async
 
 
 async def basic_async_example():
@@ -191,7 +190,7 @@ async def channel_processing_simulation():
         # 結果分析
         successful_results = [r for r in results if r.success]
         total_entries = sum(len(r.entries) for r in successful_results)
-        total_text_length = sum(len(r.to_plain_text()) for r in successful_results)
+        total_text_length = sum(r.total_text_length for r in successful_results)
         
         print(f"\n=== チャンネル分析結果 ===")
         print(f"処理時間:       {end_time - start_time:.2f}秒")
@@ -224,5 +223,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_async(main())
 
@@ -54,6 +54,7 @@ setup(
     python_requires=">=3.8",
     install_requires=requirements,
     extras_require={
+        # ffmpeg（pipでは入らない）があれば音声をOpusに変換してアップロードサイズを抑える
         "audio": [
             "openai>=1.0.0",
             "yt-dlp>=2023.1.6",
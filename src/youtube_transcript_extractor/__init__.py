@@ -25,9 +25,9 @@ from .extractors import (
     AssemblyAIExtractor,
 )
 
-from .async_extractor import AsyncYouTubeTranscriptExtractor
+from .async_extractor import AsyncYouTubeTranscriptExtractor, run_async
 
-from .cache import TranscriptCache
+from .cache import TranscriptCache, SQLiteTranscriptCache
 
 from .exceptions import (
     TranscriptError,
@@ -53,9 +53,11 @@ __all__ = [
     
     # Async support
     "AsyncYouTubeTranscriptExtractor",
+    "run_async",
     
     # Cache
     "TranscriptCache",
+    "SQLiteTranscriptCache",
     
     # Exceptions
     "TranscriptError",
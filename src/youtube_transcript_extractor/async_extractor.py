@@ -2,28 +2,126 @@
 Async support for YouTube transcript extraction
 """
 
+import os
 import asyncio
+import itertools
+import random
 import time
-from typing import List, Optional, Union
-from concurrent.futures import ThreadPoolExecutor
+import logging
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional, Tuple, TypeVar, Union
 
-from .core import YouTubeTranscriptExtractor, TranscriptResult, TranscriptConfig
+import aiohttp
+import ijson
+from aiolimiter import AsyncLimiter
+
+from .core import YouTubeTranscriptExtractor, TranscriptResult, TranscriptConfig, TranscriptMethod
+from .extractors import InnerTubeAPIExtractor
+
+logger = logging.getLogger(__name__)
+
+# player APIレスポンス中のキャプショントラック配列の位置（ijsonのprefix形式）
+CAPTION_TRACKS_PREFIX = "captions.playerCaptionsTracklistRenderer.captionTracks.item"
+
+T = TypeVar("T")
 
 
 class AsyncYouTubeTranscriptExtractor:
     """非同期YouTube文字起こし抽出器"""
     
-    def __init__(self, config: Optional[Union[dict, TranscriptConfig]] = None, max_workers: int = 5):
+    # レート制限・一時的な障害とみなして再試行するHTTPステータス
+    RETRY_STATUSES = (429, 503)
+    MAX_RETRIES = 5
+    
+    # コネクションプール全体の上限
+    CONNECTION_LIMIT = 128
+    
+    # batch_size="auto" のときに同時に保持するタスク数（max_workersに対する倍率）。
+    # セマフォ待ちのタスクを少し余分に持たせ、完了時にワーカーを遊ばせない
+    AUTO_WINDOW_FACTOR = 2
+    
+    def __init__(
+        self,
+        config: Optional[Union[dict, TranscriptConfig]] = None,
+        max_workers: Optional[int] = None,
+        requests_per_minute: int = 300,
+        limit_per_host: int = 16
+    ):
         """
         初期化
         
+        InnerTube APIはaiohttpで直接呼び出し、インスタンスが所有する単一の
+        ClientSessionでコネクションを再利用する。その他の手法はブロッキングな
+        SDKを使うため、イベントループのデフォルトエグゼキューターで実行する。
+        
         Args:
             config: 設定辞書またはTranscriptConfigオブジェクト
-            max_workers: 最大ワーカー数
+            max_workers: 最大ワーカー数（同時に処理する動画数）。省略時は
+                config.max_workers、それも未設定なら min(32, CPU数 * 5)。
+                処理はネットワークI/O待ちが支配的なためCPU数より大きく取るが、
+                実際の上限はホストあたりのコネクションプールサイズで決まる
+            requests_per_minute: 1分あたりのHTTPリクエスト上限
+            limit_per_host: ホストあたりの同時接続数の上限
         """
-        self.config = config
+        if isinstance(config, dict):
+            self.config = TranscriptConfig(**config)
+        elif isinstance(config, TranscriptConfig):
+            self.config = config
+        else:
+            self.config = TranscriptConfig()
+        
+        if max_workers is None:
+            max_workers = self.config.max_workers or min(32, (os.cpu_count() or 1) * 5)
+        
         self.max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.limit_per_host = limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Python 3.9以前のasyncio.Semaphore/Lockは生成時のイベントループに結び付くため、
+        # 実行中のループ内で初めて必要になった時点で作成する（_bind_loop参照）
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._api_key_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limiter = AsyncLimiter(requests_per_minute, 60)
+        
+        # InnerTube以外の手法用。各抽出器は呼び出し間で状態を持たないため、
+        # エグゼキューターの複数スレッドから共有できる
+        self._sync_extractor = YouTubeTranscriptExtractor(self.config)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """共有ClientSessionを取得（未作成なら作成）"""
+        if self._session is None or self._session.closed:
+            # 接続先はyoutube.comに集中するため、ホスト単位で接続数を制限する
+            connector = aiohttp.TCPConnector(
+                limit=self.CONNECTION_LIMIT,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+                keepalive_timeout=75,
+            )
+            # 圧縮とkeep-aliveはaiohttp側で制御する
+            headers = {
+                key: value
+                for key, value in InnerTubeAPIExtractor._HEADERS.items()
+                if key not in ("Accept-Encoding", "Connection")
+            }
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+            )
+        return self._session
+    
+    def _bind_loop(self):
+        """実行中のイベントループ用のセマフォとロックを用意（ループが変わったら作り直す）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_workers)
+            self._api_key_lock = asyncio.Lock()
+            self._loop = loop
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """実行中のイベントループ用の同時実行数セマフォを取得"""
+        self._bind_loop()
+        return self._sem
     
     async def get_transcript_async(self, video_url_or_id: str, language: str = "en") -> TranscriptResult:
         """
@@ -36,34 +134,116 @@ class AsyncYouTubeTranscriptExtractor:
         Returns:
             TranscriptResult: 文字起こし結果
         """
+        video_id = YouTubeTranscriptExtractor.extract_video_id(video_url_or_id)
+        
+        async with self._get_semaphore():
+            return await self._get_transcript_with_fallback(video_id, language)
+    
+    async def _get_transcript_with_fallback(self, video_id: str, language: str) -> TranscriptResult:
+        """フォールバック手法を順次試行（内部使用）"""
+        session = self._get_session()
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            self.executor, 
-            self._get_transcript_sync, 
-            video_url_or_id, 
-            language
+        
+        for method in self.config.fallback_methods:
+            try:
+                start_time = time.time()
+                
+                if method == TranscriptMethod.INNERTUBE_API:
+                    result = await self._get_transcript_async(session, video_id, language)
+                else:
+                    result = await loop.run_in_executor(
+                        None,
+                        self._get_transcript_sync,
+                        video_id,
+                        language,
+                        method
+                    )
+                
+                if result is None:
+                    logger.warning("Extractor not available for method: %s", method.value)
+                    continue
+                
+                result.processing_time = time.time() - start_time
+                
+                if result.success:
+                    return result
+                logger.warning("Method %s failed: %s", method.value, result.error_message)
+            
+            except Exception as e:
+                logger.error("Method %s raised exception: %s", method.value, e)
+                continue
+        
+        # すべての手法が失敗した場合
+        return TranscriptResult(
+            entries=[],
+            method=self.config.fallback_methods[0] if self.config.fallback_methods else TranscriptMethod.INNERTUBE_API,
+            language=language,
+            success=False,
+            error_message="All extraction methods failed"
         )
     
     async def get_multiple_transcripts(
-        self, 
-        video_ids: List[str], 
-        language: str = "en"
+        self,
+        video_ids: List[str],
+        language: str = "en",
+        batch_size: Union[int, str, None] = "auto"
     ) -> List[Union[TranscriptResult, Exception]]:
         """
         複数動画の文字起こしを並行取得
         
+        大量の動画IDを一度にタスク化するとイベントループのスケジューリング負荷が
+        増えるため、同時に保持するタスクをbatch_size件までに抑える。1件完了する
+        たびに次の動画を開始するスライディングウィンドウのため、遅い動画が
+        あっても他のワーカーは待たされない。
+        
         Args:
             video_ids: 動画IDのリスト
             language: 言語コード
+            batch_size: 同時に保持するタスク数の上限。"auto" は
+                max_workers * AUTO_WINDOW_FACTOR、Noneは上限なし（全件を一度にタスク化）
         
         Returns:
-            List[Union[TranscriptResult, Exception]]: 結果のリスト
+            List[Union[TranscriptResult, Exception]]: 結果のリスト（入力と同じ順序）
+        
+        Raises:
+            ValueError: batch_sizeが1未満の場合
         """
-        tasks = [
-            self.get_transcript_async(video_id, language) 
-            for video_id in video_ids
-        ]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        if batch_size is None:
+            tasks = [
+                self.get_transcript_async(video_id, language)
+                for video_id in video_ids
+            ]
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if batch_size == "auto":
+            batch_size = self.max_workers * self.AUTO_WINDOW_FACTOR
+        elif isinstance(batch_size, bool) or not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, 'auto' or None: {batch_size!r}")
+        
+        results: List[Union[TranscriptResult, Exception, None]] = [None] * len(video_ids)
+        queued = iter(enumerate(video_ids))
+        pending = set()
+        
+        def launch(count: int):
+            for index, video_id in itertools.islice(queued, count):
+                pending.add(asyncio.ensure_future(self._get_transcript_or_exception(index, video_id, language)))
+        
+        launch(batch_size)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, result = task.result()
+                results[index] = result
+            launch(len(done))
+        
+        return results
+    
+    async def _get_transcript_or_exception(self, index: int, video_id: str, language: str):
+        """文字起こしを取得し、入力順のインデックスと共に返す（例外は戻り値として返す）"""
+        try:
+            return index, await self.get_transcript_async(video_id, language)
+        except Exception as e:
+            return index, e
     
     async def get_transcripts_with_progress(
         self,
@@ -74,6 +254,9 @@ class AsyncYouTubeTranscriptExtractor:
         """
         進捗コールバック付きで複数動画の文字起こしを取得
         
+        全動画を並行に処理し、完了した順に進捗コールバックを呼び出す。
+        戻り値は入力と同じ順序に並ぶ。
+        
         Args:
             video_ids: 動画IDのリスト
             language: 言語コード
@@ -82,51 +265,226 @@ class AsyncYouTubeTranscriptExtractor:
         Returns:
             List[TranscriptResult]: 結果のリスト
         """
-        results = []
         total = len(video_ids)
+        results: List[Optional[TranscriptResult]] = [None] * total
         
-        for i, video_id in enumerate(video_ids):
-            try:
-                result = await self.get_transcript_async(video_id, language)
-                results.append(result)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total, video_id, result.success)
-                    
-            except Exception as e:
-                error_result = TranscriptResult(
-                    entries=[], 
-                    method=None, 
-                    language=language, 
-                    success=False,
-                    error_message=str(e)
-                )
-                results.append(error_result)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total, video_id, False)
+        tasks = [
+            asyncio.ensure_future(self._get_transcript_indexed(i, video_id, language))
+            for i, video_id in enumerate(video_ids)
+        ]
+        
+        for completed, future in enumerate(asyncio.as_completed(tasks), 1):
+            i, result = await future
+            results[i] = result
+            
+            if progress_callback:
+                progress_callback(completed, total, video_ids[i], result.success)
         
         return results
     
-    def _get_transcript_sync(self, video_url_or_id: str, language: str) -> TranscriptResult:
-        """同期版の文字起こし取得（内部使用）"""
-        extractor = YouTubeTranscriptExtractor(self.config)
-        return extractor.get_transcript(video_url_or_id, language)
+    async def _get_transcript_indexed(self, index: int, video_id: str, language: str):
+        """文字起こしを取得し、入力順のインデックスと共に返す（例外は失敗結果に変換）"""
+        try:
+            result = await self.get_transcript_async(video_id, language)
+        except Exception as e:
+            result = TranscriptResult(
+                entries=[],
+                method=None,
+                language=language,
+                success=False,
+                error_message=str(e)
+            )
+        return index, result
+    
+    async def _get_transcript_async(
+        self,
+        session: aiohttp.ClientSession,
+        video_id: str,
+        language: str
+    ) -> TranscriptResult:
+        """InnerTube APIから非同期で文字起こしを取得（内部使用）"""
+        try:
+            # APIキーはキャッシュ済みなら動画ページの取得を省略する
+            api_key, from_cache = await self._get_api_key(session, video_id)
+            
+            # InnerTube player APIを呼び出し、キャプショントラックを取得
+            try:
+                tracks = await self._request_caption_tracks(session, api_key, video_id)
+            except aiohttp.ClientResponseError as e:
+                if not from_cache or e.status not in InnerTubeAPIExtractor.KEY_REJECTED_STATUSES:
+                    raise
+                # キャッシュしたキーが失効した場合は取り直して一度だけ再試行
+                api_key, _ = await self._get_api_key(session, video_id, rejected=api_key)
+                tracks = await self._request_caption_tracks(session, api_key, video_id)
+            if not tracks:
+                raise Exception("No caption tracks found")
+            
+            target_track = InnerTubeAPIExtractor._select_track(tracks, language)
+            
+            # キャプションXMLを取得
+            xml_content = await self._request(
+                session, "GET",
+                InnerTubeAPIExtractor._caption_url(target_track),
+                lambda response: response.read()
+            )
+            
+            return TranscriptResult(
+                entries=InnerTubeAPIExtractor._parse_caption_xml(xml_content),
+                method=TranscriptMethod.INNERTUBE_API,
+                language=target_track.get("languageCode", language),
+                success=True
+            )
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return TranscriptResult(
+                entries=[], method=TranscriptMethod.INNERTUBE_API,
+                language=language, success=False,
+                error_message=f"Network error: {str(e)}"
+            )
+        except Exception as e:
+            return TranscriptResult(
+                entries=[], method=TranscriptMethod.INNERTUBE_API,
+                language=language, success=False,
+                error_message=f"InnerTube API error: {str(e)}"
+            )
+    
+    async def _get_api_key(
+        self,
+        session: aiohttp.ClientSession,
+        video_id: str,
+        rejected: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        APIキーを取得（キャッシュになければ動画ページから取得）
+        
+        同時に処理中の動画がキャッシュミスしても、動画ページの取得は1回にまとめる。
+        
+        Args:
+            session: 共有ClientSession
+            video_id: キーの取得に使う動画ID
+            rejected: player APIに拒否されたキー（キャッシュから破棄して取り直す）
+        
+        Returns:
+            Tuple[str, bool]: (APIキー, キャッシュから取得したか)
+        """
+        if rejected is not None:
+            InnerTubeAPIExtractor._invalidate_api_key(rejected)
+        
+        api_key = InnerTubeAPIExtractor._get_cached_api_key()
+        if api_key is None:
+            self._bind_loop()
+            async with self._api_key_lock:
+                # 待っている間に他のタスクが取得していればそのキーを使う
+                api_key = InnerTubeAPIExtractor._get_cached_api_key()
+                if api_key is None:
+                    return await self._fetch_api_key(session, video_id), False
+        return api_key, True
+    
+    async def _fetch_api_key(self, session: aiohttp.ClientSession, video_id: str) -> str:
+        """動画ページからAPIキーを取得し、キャッシュに保存"""
+        html = await self._request(
+            session, "GET",
+            InnerTubeAPIExtractor.WATCH_URL.format(video_id=video_id),
+            lambda response: response.read()
+        )
+        
+        api_key = InnerTubeAPIExtractor._find_api_key(html)
+        if not api_key:
+            raise Exception("INNERTUBE_API_KEY not found in video page")
+        
+        InnerTubeAPIExtractor._store_api_key(api_key)
+        return api_key
+    
+    async def _request_caption_tracks(self, session: aiohttp.ClientSession, api_key: str, video_id: str) -> List[dict]:
+        """player APIを呼び出し、キャプショントラックを取得"""
+        return await self._request(
+            session, "POST",
+            InnerTubeAPIExtractor.PLAYER_URL.format(api_key=api_key),
+            self._read_caption_tracks,
+            json=InnerTubeAPIExtractor._build_player_data(video_id)
+        )
+    
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable],
+        **kwargs
+    ):
+        """
+        レート制限付きでHTTPリクエストを送信（429/503は指数バックオフで再試行）
+        
+        Args:
+            session: 共有ClientSession
+            method: HTTPメソッド
+            url: リクエストURL
+            read: レスポンス本文を読み出すコルーチン関数
+        
+        Returns:
+            readの戻り値
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                async with self._limiter:
+                    async with session.request(method, url, **kwargs) as response:
+                        response.raise_for_status()
+                        return await read(response)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in self.RETRY_STATUSES or attempt >= self.MAX_RETRIES:
+                    raise
+                delay = self._retry_delay(attempt, e.headers)
+                logger.warning("HTTP %s from %s, retrying in %.1fs", e.status, e.request_info.url.host, delay)
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    async def _read_caption_tracks(response: aiohttp.ClientResponse) -> List[dict]:
+        """
+        player APIのレスポンスを逐次解析してキャプショントラックのみを取り出す
+        
+        レスポンス全体を辞書に展開せず、必要な配列要素だけを組み立てる。
+        """
+        return [
+            track
+            async for track in ijson.items_async(response.content, CAPTION_TRACKS_PREFIX, use_float=True)
+        ]
+    
+    @staticmethod
+    def _retry_delay(attempt: int, headers) -> float:
+        """再試行までの待機秒数（Retry-Afterヘッダーを優先）"""
+        retry_after = headers.get("Retry-After") if headers else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return 2 ** attempt + random.random()
+    
+    def _get_transcript_sync(self, video_id: str, language: str, method: TranscriptMethod) -> Optional[TranscriptResult]:
+        """同期版の抽出器で指定手法を実行（内部使用）"""
+        method_extractor = self._sync_extractor._get_extractor(method)
+        if not method_extractor:
+            return None
+        return method_extractor.extract(video_id, language)
+    
+    async def close(self):
+        """共有ClientSessionを閉じる"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def __aenter__(self):
         """非同期コンテキストマネージャーのエントリ"""
+        self._get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """非同期コンテキストマネージャーの終了"""
-        self.executor.shutdown(wait=True)
+        await self.close()
 
 
 # 使用例とヘルパー関数
 async def extract_channel_transcripts(
-    channel_videos: List[str], 
+    channel_videos: List[str],
     language: str = "en",
-    max_workers: int = 5,
+    max_workers: Optional[int] = None,
     progress_callback: Optional[callable] = None
 ) -> dict:
     """
@@ -135,7 +493,7 @@ async def extract_channel_transcripts(
     Args:
         channel_videos: チャンネルの動画IDリスト
         language: 言語コード
-        max_workers: 最大ワーカー数
+        max_workers: 最大ワーカー数（省略時は自動設定）
         progress_callback: 進捗コールバック
     
     Returns:
@@ -143,17 +501,47 @@ async def extract_channel_transcripts(
     """
     async with AsyncYouTubeTranscriptExtractor(max_workers=max_workers) as extractor:
         results = await extractor.get_transcripts_with_progress(
-            channel_videos, 
-            language, 
+            channel_videos,
+            language,
             progress_callback
         )
     
     return {
-        video_id: result 
+        video_id: result
         for video_id, result in zip(channel_videos, results)
     }
 
 
+def run_async(main: Coroutine[Any, Any, T], use_uvloop: Optional[bool] = None) -> T:
+    """
+    コルーチンを新しいイベントループで実行（asyncio.runの代わりに使用）
+    
+    uvloopがインストールされていればuvloopのイベントループで実行する。
+    グローバルなイベントループポリシーは変更しないため、アプリケーション側の
+    asyncio.run()や他のライブラリには影響しない。
+    
+    Args:
+        main: 実行するコルーチン
+        use_uvloop: uvloopを使うか。省略時は環境変数 YTE_DISABLE_UVLOOP が
+            "1"/"true"/"yes" でなければ使う（呼び出し時に判定）
+    
+    Returns:
+        コルーチンの戻り値
+    """
+    if use_uvloop is None:
+        use_uvloop = os.getenv("YTE_DISABLE_UVLOOP", "").lower() not in ("1", "true", "yes")
+    
+    if use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            logger.debug("uvloop is not installed, using the default event loop")
+        else:
+            return uvloop.run(main)
+    
+    return asyncio.run(main)
+
+
 def simple_progress_callback(current: int, total: int, video_id: str, success: bool):
     """シンプルな進捗表示コールバック"""
     status = "✅" if success else "❌"
@@ -171,7 +559,7 @@ async def main():
     # 複数動画の並行処理
     video_ids = ["dQw4w9WgXcQ", "9bZkp7q19f0", "kJQP7kiw5Fk"]
     results = await extract_channel_transcripts(
-        video_ids, 
+        video_ids,
         progress_callback=simple_progress_callback
     )
     
@@ -183,5 +571,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
-
+    run_async(main())
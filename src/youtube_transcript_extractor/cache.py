@@ -4,36 +4,235 @@ Caching functionality for transcript results
 
 import os
 import json
+import math
 import hashlib
-from datetime import datetime, timedelta
-from typing import Optional
+import mmap
+import time
+import queue
+import struct
+import atexit
+import sqlite3
+import tempfile
+import threading
+import orjson
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import timedelta
+from typing import Optional, Tuple
+from urllib.parse import quote
 
 from .core import TranscriptResult, TranscriptEntry, TranscriptMethod
 
+# 現行のキャッシュファイル拡張子と、移行期間中に共存する旧形式（msgpack/JSON）の拡張子
+CACHE_SUFFIX = '.bin'
+_KNOWN_SUFFIXES = (CACHE_SUFFIX, '.msgpack', '.json')
+
+# バイナリキャッシュの形式（リトルエンディアン）:
+#   ヘッダー: magic, 保存時刻(epoch), 処理時間(NaNはNone), エントリ数
+#   文字列 (method, 結果の言語, video_id): uint16 長さ + UTF-8
+#   エントリ: double start, double end, uint32 長さ + UTF-8 テキスト
+# 結果の言語はフォールバックで要求と異なる場合があるため、キャッシュキーの言語とは別に保存する
+# （YTC1はキーの言語を保存していたため読み込まず、再取得させる）
+_MAGIC = b'YTC2'
+_HEADER = struct.Struct('<4sddI')
+_STR_LEN = struct.Struct('<H')
+_ENTRY = struct.Struct('<ddI')
+
+
+# ファイル書き込みはプロセス内で共有する単一のバックグラウンドスレッドに任せ、呼び出し元をブロックしない。
+# スレッドやatexitがインスタンスを参照しないため、TranscriptCacheはインスタンスごとにスレッドを増やさず解放される
+_write_q: "queue.Queue[Tuple[str, str, bytes, float]]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _reset_writer():
+    """
+    fork後の子プロセスで書き込みスレッドの状態を初期化
+    
+    スレッドはforkで複製されないため、親の状態のままでは誰もキューを処理せず
+    flush()が永久に待機する。親のキューに残っていた書き込みは親プロセスが行う。
+    """
+    global _write_q, _writer, _writer_lock
+    _write_q = queue.Queue()
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writer)
+
+
+def _submit_write(cache_dir: str, cache_path: str, payload: bytes, saved_at: float):
+    """書き込みキューに追加（初回に書き込みスレッドを起動）"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_loop, args=(_write_q,), name="TranscriptCacheWriter", daemon=True)
+                _writer.start()
+    _write_q.put((cache_dir, cache_path, payload, saved_at))
+
+
+def _flush_writes():
+    """書き込みキューが空になるまで待機"""
+    _write_q.join()
+
+
+# 終了時に書き込み待ちのキャッシュを保存する（fork後も現在のキューを参照する）
+atexit.register(_flush_writes)
+
+
+def _write_loop(write_q: "queue.Queue[Tuple[str, str, bytes, float]]"):
+    """書き込みキューを処理するバックグラウンドスレッド"""
+    while True:
+        cache_dir, cache_path, payload, saved_at = write_q.get()
+        try:
+            _write_file(cache_dir, cache_path, payload, saved_at)
+        except Exception:
+            pass  # キャッシュ保存失敗は無視
+        finally:
+            write_q.task_done()
+
+
+def _write_file(cache_dir: str, cache_path: str, payload: bytes, saved_at: float):
+    """キャッシュファイルをアトミックに書き込む"""
+    # 一時ファイルに書き込んでからrenameし、書き込み途中のファイルを読ませない
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        # 保存時刻をmtimeにも記録し、TTL判定をstatだけで行えるようにする
+        os.utime(tmp_path, (saved_at, saved_at))
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _quote_key_part(value: str) -> str:
+    """ファイル名に使えない文字をエスケープ（区切りの "__" と衝突しないよう "_" も対象）"""
+    return quote(value, safe='').replace('_', '%5F')
+
+
+def _encode_result(video_id: str, result: TranscriptResult, saved_at: float) -> bytes:
+    """TranscriptResultをバイナリ形式に変換"""
+    processing_time = result.processing_time
+    parts = [_HEADER.pack(
+        _MAGIC,
+        saved_at,
+        math.nan if processing_time is None else processing_time,
+        len(result.entries)
+    )]
+    
+    for value in (result.method.value, result.language, video_id):
+        encoded = value.encode('utf-8')
+        parts.append(_STR_LEN.pack(len(encoded)))
+        parts.append(encoded)
+    
+    append = parts.append
+    pack_entry = _ENTRY.pack
+    for entry in result.entries:
+        text = entry.text.encode('utf-8')
+        append(pack_entry(entry.start_time, entry.end_time, len(text)))
+        append(text)
+    
+    return b''.join(parts)
+
+
+def _decode_result(buf) -> TranscriptResult:
+    """バイナリ形式（bytesまたはmmap）からTranscriptResultを復元"""
+    magic, _, processing_time, count = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC:
+        raise ValueError("Unknown cache file format")
+    offset = _HEADER.size
+    
+    strings = []
+    for _ in range(3):
+        (length,) = _STR_LEN.unpack_from(buf, offset)
+        offset += _STR_LEN.size
+        strings.append(buf[offset:offset + length].decode('utf-8'))
+        offset += length
+    method, language, _ = strings
+    
+    entries = []
+    append = entries.append
+    unpack_entry = _ENTRY.unpack_from
+    entry_size = _ENTRY.size
+    for _ in range(count):
+        start_time, end_time, length = unpack_entry(buf, offset)
+        offset += entry_size
+        append(TranscriptEntry(buf[offset:offset + length].decode('utf-8'), start_time, end_time))
+        offset += length
+    
+    if offset != len(buf):
+        raise ValueError("Truncated or corrupted cache file")
+    
+    return TranscriptResult(
+        entries=entries,
+        method=TranscriptMethod(method),
+        language=language,
+        success=True,
+        processing_time=None if math.isnan(processing_time) else processing_time
+    )
+
+
+def _copy_result(result: TranscriptResult) -> TranscriptResult:
+    """呼び出し元の変更がキャッシュに及ばないよう結果を複製（エントリは不変なのでリストのみ複製）"""
+    return replace(result, entries=list(result.entries))
+
+
+def _read_result(cache_path: str) -> TranscriptResult:
+    """キャッシュファイルをメモリマップして読み込む"""
+    with open(cache_path, 'rb') as f:
+        # テキストはdecode時にコピーされるため、マップは読み込み後すぐに閉じてよい
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _decode_result(buf)
+
 
 class TranscriptCache:
     """文字起こし結果のキャッシュ管理"""
     
-    def __init__(self, cache_dir: str = ".transcript_cache", ttl_hours: int = 24):
+    def __init__(
+        self,
+        cache_dir: str = ".transcript_cache",
+        ttl_hours: int = 24,
+        memory_cache_size: int = 1024
+    ):
         """
         初期化
         
         Args:
             cache_dir: キャッシュディレクトリ
             ttl_hours: キャッシュの有効期間（時間）
+            memory_cache_size: プロセス内LRUキャッシュの最大件数（0で無効）
         """
         self.cache_dir = cache_dir
         self.ttl = timedelta(hours=ttl_hours)
+        self._ttl_seconds = self.ttl.total_seconds()
         os.makedirs(cache_dir, exist_ok=True)
+        
+        # ディスク読み込みの前段に置くLRU: (video_id, language) -> (結果, 保存時刻)
+        self.memory_cache_size = memory_cache_size
+        self._mem: "OrderedDict[Tuple[str, str], Tuple[TranscriptResult, float]]" = OrderedDict()
+        self._mem_lock = threading.Lock()
     
     def _get_cache_key(self, video_id: str, language: str) -> str:
-        """キャッシュキーを生成"""
+        """
+        キャッシュキーを生成
+        
+        "{video_id}__{language}" 形式とし、ファイル名だけで対象を絞り込めるようにする。
+        """
+        return f"{_quote_key_part(video_id)}__{_quote_key_part(language)}"
+    
+    def _get_legacy_cache_key(self, video_id: str, language: str) -> str:
+        """旧形式（MD5ハッシュのJSONファイル）のキャッシュキーを生成（移行用、次のリリースで削除予定）"""
         key_string = f"{video_id}_{language}"
         return hashlib.md5(key_string.encode()).hexdigest()
     
-    def _get_cache_path(self, cache_key: str) -> str:
+    def _get_cache_path(self, cache_key: str, suffix: str = CACHE_SUFFIX) -> str:
         """キャッシュファイルパスを取得"""
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
+        return os.path.join(self.cache_dir, f"{cache_key}{suffix}")
     
     def get(self, video_id: str, language: str) -> Optional[TranscriptResult]:
         """
@@ -46,44 +245,44 @@ class TranscriptCache:
         Returns:
             Optional[TranscriptResult]: キャッシュされた結果（存在しない場合はNone）
         """
+        mem_key = (video_id, language)
+        with self._mem_lock:
+            cached = self._mem.get(mem_key)
+            if cached is not None:
+                result, saved_at = cached
+                if time.time() - saved_at <= self._ttl_seconds:
+                    self._mem.move_to_end(mem_key)
+                    return _copy_result(result)
+                del self._mem[mem_key]
+        
         cache_key = self._get_cache_key(video_id, language)
         cache_path = self._get_cache_path(cache_key)
         
-        if not os.path.exists(cache_path):
+        # 旧形式（msgpack/JSON）のファイルは読まず、未キャッシュとして再取得させる
+        try:
+            mtime = os.stat(cache_path).st_mtime
+        except FileNotFoundError:
             return None
         
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            # TTL確認
-            cached_time = datetime.fromisoformat(cache_data['timestamp'])
-            if datetime.now() - cached_time > self.ttl:
+        # TTL確認（保存時刻はmtimeに記録されている）
+        if time.time() - mtime > self._ttl_seconds:
+            try:
                 os.remove(cache_path)
-                return None
-            
-            # TranscriptResultを復元
-            entries = [
-                TranscriptEntry(
-                    text=entry['text'],
-                    start_time=entry['start_time'],
-                    end_time=entry['end_time']
-                ) 
-                for entry in cache_data['entries']
-            ]
-            
-            return TranscriptResult(
-                entries=entries,
-                method=TranscriptMethod(cache_data['method']),
-                language=cache_data['language'],
-                success=cache_data['success'],
-                processing_time=cache_data.get('processing_time')
-            )
+            except FileNotFoundError:
+                pass  # 他のスレッド・プロセスが先に削除済み
+            return None
+        
+        try:
+            result = _read_result(cache_path)
+            self._remember(mem_key, result, mtime)
+            return result
             
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+        except (struct.error, ValueError) as e:
             # 破損したキャッシュファイルを削除
-            if os.path.exists(cache_path):
+            try:
                 os.remove(cache_path)
+            except FileNotFoundError:
+                pass
             return None
         except Exception:
             return None
@@ -103,21 +302,25 @@ class TranscriptCache:
         cache_key = self._get_cache_key(video_id, language)
         cache_path = self._get_cache_path(cache_key)
         
-        cache_data = {
-            'timestamp': datetime.now().isoformat(),
-            'video_id': video_id,
-            'language': language,
-            'entries': [entry.to_dict() for entry in result.entries],
-            'method': result.method.value,
-            'success': result.success,
-            'processing_time': result.processing_time
-        }
+        now = time.time()
+        self._remember((video_id, language), result, now)
         
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            payload = _encode_result(video_id, result, now)
         except Exception:
-            pass  # キャッシュ保存失敗は無視
+            return  # キャッシュ保存失敗は無視
+        
+        _submit_write(self.cache_dir, cache_path, payload, now)
+    
+    def flush(self):
+        """書き込み待ちのキャッシュがすべてディスクに保存されるまで待機（書き込みスレッドは全インスタンスで共有）"""
+        _flush_writes()
+    
+    def close(self):
+        """書き込み待ちのキャッシュを保存し、プロセス内LRUキャッシュを解放"""
+        self.flush()
+        with self._mem_lock:
+            self._mem.clear()
     
     def clear(self, video_id: Optional[str] = None, language: Optional[str] = None):
         """
@@ -127,88 +330,137 @@ class TranscriptCache:
             video_id: 特定の動画IDのキャッシュのみクリア（省略時は全て）
             language: 特定の言語のキャッシュのみクリア（省略時は全て）
         """
+        # 書き込み待ちのファイルが削除後に作成されないよう、先に書き出す
+        self.flush()
+        self._forget(video_id, language)
+        
         if video_id and language:
             # 特定のキャッシュのみ削除
             cache_key = self._get_cache_key(video_id, language)
-            cache_path = self._get_cache_path(cache_key)
-            if os.path.exists(cache_path):
-                os.remove(cache_path)
-        else:
-            # 全キャッシュまたは条件に合うキャッシュを削除
-            for filename in os.listdir(self.cache_dir):
-                if not filename.endswith('.json'):
+            cache_paths = [self._get_cache_path(cache_key, suffix) for suffix in _KNOWN_SUFFIXES]
+            cache_paths.append(self._get_cache_path(self._get_legacy_cache_key(video_id, language), '.json'))
+            for cache_path in cache_paths:
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+            return
+        
+        video_part = _quote_key_part(video_id) if video_id else None
+        language_part = _quote_key_part(language) if language else None
+        
+        # 全キャッシュまたは条件に合うキャッシュを削除
+        # 他のインスタンス・プロセスが書いたファイルも対象にするため、毎回ディレクトリを走査する
+        # （判定はファイル名だけで行い、現行形式のファイルは開かない）
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                filename = entry.name
+                if not filename.endswith(_KNOWN_SUFFIXES):
                     continue
                 
-                cache_path = os.path.join(self.cache_dir, filename)
+                if "__" in filename:
+                    stem = os.path.splitext(filename)[0]
+                    file_video, _, file_language = stem.rpartition("__")
+                    if video_part and file_video != video_part:
+                        continue
+                    if language_part and file_language != language_part:
+                        continue
+                elif video_id or language:
+                    # 旧形式のファイルは内容を確認
+                    self._clear_legacy_file(entry.path, video_id, language)
+                    continue
                 
-                if video_id or language:
-                    # 条件指定がある場合は内容を確認
-                    try:
-                        with open(cache_path, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
-                        
-                        should_delete = True
-                        if video_id and cache_data.get('video_id') != video_id:
-                            should_delete = False
-                        if language and cache_data.get('language') != language:
-                            should_delete = False
-                        
-                        if should_delete:
-                            os.remove(cache_path)
-                    except Exception:
-                        # 読み込めないファイルは削除
-                        os.remove(cache_path)
-                else:
-                    # 全削除
-                    os.remove(cache_path)
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass  # 他のプロセスが削除済み
     
-    def cleanup_expired(self):
-        """期限切れのキャッシュを削除"""
-        current_time = datetime.now()
+    def _remember(self, mem_key: Tuple[str, str], result: TranscriptResult, saved_at: float):
+        """プロセス内LRUキャッシュに登録（上限を超えたら最も古いものを破棄）"""
+        if self.memory_cache_size <= 0:
+            return
         
-        for filename in os.listdir(self.cache_dir):
-            if not filename.endswith('.json'):
-                continue
+        with self._mem_lock:
+            self._mem[mem_key] = (_copy_result(result), saved_at)
+            self._mem.move_to_end(mem_key)
+            while len(self._mem) > self.memory_cache_size:
+                self._mem.popitem(last=False)
+    
+    def _forget(self, video_id: Optional[str], language: Optional[str]):
+        """条件に合うエントリをプロセス内LRUキャッシュから削除"""
+        with self._mem_lock:
+            if not (video_id or language):
+                self._mem.clear()
+                return
             
-            cache_path = os.path.join(self.cache_dir, filename)
+            for mem_key in [
+                key for key in self._mem
+                if (not video_id or key[0] == video_id) and (not language or key[1] == language)
+            ]:
+                del self._mem[mem_key]
+    
+    def _clear_legacy_file(self, cache_path: str, video_id: Optional[str], language: Optional[str]):
+        """旧形式のキャッシュファイルを条件に応じて削除"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
             
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
-                cached_time = datetime.fromisoformat(cache_data['timestamp'])
-                if current_time - cached_time > self.ttl:
-                    os.remove(cache_path)
-                    
-            except Exception:
-                # 読み込めないファイルは削除
+            should_delete = True
+            if video_id and cache_data.get('video_id') != video_id:
+                should_delete = False
+            if language and cache_data.get('language') != language:
+                should_delete = False
+            
+            if should_delete:
                 os.remove(cache_path)
+        except Exception:
+            # 読み込めないファイルは削除
+            os.remove(cache_path)
+    
+    def cleanup_expired(self):
+        """期限切れのキャッシュ（読み込まれない旧形式のファイルを含む）を削除"""
+        self.flush()
+        now = time.time()
+        ttl_seconds = self._ttl_seconds
+        
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(_KNOWN_SUFFIXES):
+                    continue
+                
+                try:
+                    if not entry.name.endswith(CACHE_SUFFIX) or now - entry.stat().st_mtime > ttl_seconds:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
     
-    def get_cache_info(self) -> dict:
-        """キャッシュの統計情報を取得"""
+    def get_cache_info(self, deep: bool = False) -> dict:
+        """
+        キャッシュの統計情報を取得
+        
+        Args:
+            deep: Trueの場合は各ファイルを読み込み、破損したファイルも期限切れとして数える
+        
+        旧形式（msgpack/JSON）のファイルは読み込まれないため期限切れとして数える。
+        """
+        self.flush()
         total_files = 0
         total_size = 0
         expired_files = 0
-        current_time = datetime.now()
+        now = time.time()
+        ttl_seconds = self._ttl_seconds
         
-        for filename in os.listdir(self.cache_dir):
-            if not filename.endswith('.json'):
-                continue
-            
-            cache_path = os.path.join(self.cache_dir, filename)
-            total_files += 1
-            total_size += os.path.getsize(cache_path)
-            
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(_KNOWN_SUFFIXES):
+                    continue
                 
-                cached_time = datetime.fromisoformat(cache_data['timestamp'])
-                if current_time - cached_time > self.ttl:
+                stat = entry.stat()
+                total_files += 1
+                total_size += stat.st_size
+                
+                if not entry.name.endswith(CACHE_SUFFIX) or now - stat.st_mtime > ttl_seconds:
+                    expired_files += 1
+                elif deep and not self._is_readable(entry.path):
                     expired_files += 1
-                    
-            except Exception:
-                expired_files += 1
         
         return {
             'total_files': total_files,
@@ -219,4 +471,222 @@ class TranscriptCache:
             'cache_dir': self.cache_dir,
             'ttl_hours': self.ttl.total_seconds() / 3600
         }
+    
+    def _is_readable(self, cache_path: str) -> bool:
+        """キャッシュファイルが読み込み可能か確認"""
+        try:
+            _read_result(cache_path)
+            return True
+        except Exception:
+            return False
+
 
+class SQLiteTranscriptCache:
+    """
+    SQLite単一ファイルによる文字起こし結果のキャッシュ管理
+    
+    TranscriptCacheと同じインターフェース（get/set/flush/close/clear/cleanup_expired/
+    get_cache_info）を持ち、(video_id, language) を主キーとする1テーブルに結果を保存する。エントリ数が多い場合の検索・削除がファイル走査ではなく
+    インデックス参照になる。
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str = ".transcript_cache",
+        ttl_hours: int = 24,
+        db_name: str = "transcripts.db"
+    ):
+        """
+        初期化
+        
+        Args:
+            cache_dir: キャッシュディレクトリ
+            ttl_hours: キャッシュの有効期間（時間）
+            db_name: データベースファイル名
+        """
+        self.cache_dir = cache_dir
+        self.ttl = timedelta(hours=ttl_hours)
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        self.db_path = os.path.join(cache_dir, db_name)
+        # 非同期抽出器のエグゼキュータースレッドからも使えるよう、接続を共有しロックで保護する
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts("
+                "video_id TEXT, language TEXT, ts REAL, payload BLOB, "
+                "PRIMARY KEY(video_id, language))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS transcripts_ts ON transcripts(ts)")
+            self._conn.commit()
+    
+    def get(self, video_id: str, language: str) -> Optional[TranscriptResult]:
+        """
+        キャッシュから文字起こしを取得
+        
+        Args:
+            video_id: 動画ID
+            language: 言語コード
+        
+        Returns:
+            Optional[TranscriptResult]: キャッシュされた結果（存在しない場合はNone）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ts, payload FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        ts, payload = row
+        if time.time() - ts > self.ttl.total_seconds():
+            self.clear(video_id, language)
+            return None
+        
+        try:
+            return self._decode_payload(payload, language)
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            # 破損したエントリを削除
+            self.clear(video_id, language)
+            return None
+    
+    @staticmethod
+    def _decode_payload(payload: bytes, language: str) -> TranscriptResult:
+        """保存されたJSONからTranscriptResultを復元（結果の言語が未保存の古いエントリはキーの言語を使う）"""
+        cache_data = orjson.loads(payload)
+        entries = [
+            TranscriptEntry(
+                text=entry['text'],
+                start_time=entry['start_time'],
+                end_time=entry['end_time']
+            )
+            for entry in cache_data['entries']
+        ]
+        
+        return TranscriptResult(
+            entries=entries,
+            method=TranscriptMethod(cache_data['method']),
+            language=cache_data.get('language', language),
+            success=True,
+            processing_time=cache_data.get('processing_time')
+        )
+    
+    def set(self, video_id: str, language: str, result: TranscriptResult):
+        """
+        文字起こし結果をキャッシュに保存
+        
+        Args:
+            video_id: 動画ID
+            language: 言語コード
+            result: 文字起こし結果
+        """
+        if not result.success:
+            return  # 失敗した結果はキャッシュしない
+        
+        try:
+            payload = orjson.dumps({
+                'entries': result.entries,
+                'method': result.method.value,
+                'language': result.language,
+                'processing_time': result.processing_time
+            })
+            
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO transcripts(video_id, language, ts, payload) VALUES (?, ?, ?, ?)",
+                    (video_id, language, time.time(), payload)
+                )
+                self._conn.commit()
+        except (orjson.JSONEncodeError, sqlite3.Error):
+            pass  # キャッシュ保存失敗は無視
+    
+    def flush(self):
+        """TranscriptCacheとの互換用（set()は同期的にコミットするため待機するものはない）"""
+    
+    def clear(self, video_id: Optional[str] = None, language: Optional[str] = None):
+        """
+        キャッシュをクリア
+        
+        Args:
+            video_id: 特定の動画IDのキャッシュのみクリア（省略時は全て）
+            language: 特定の言語のキャッシュのみクリア（省略時は全て）
+        """
+        conditions = []
+        params = []
+        if video_id:
+            conditions.append("video_id = ?")
+            params.append(video_id)
+        if language:
+            conditions.append("language = ?")
+            params.append(language)
+        
+        query = "DELETE FROM transcripts"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        with self._lock:
+            self._conn.execute(query, params)
+            self._conn.commit()
+    
+    def cleanup_expired(self):
+        """期限切れのキャッシュを削除"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE ts < ?",
+                (time.time() - self.ttl.total_seconds(),)
+            )
+            self._conn.commit()
+    
+    def get_cache_info(self, deep: bool = False) -> dict:
+        """
+        キャッシュの統計情報を取得
+        
+        TranscriptCacheと同じキーで返す（total_files等はエントリ数を表す）。
+        
+        Args:
+            deep: Trueの場合は各エントリを読み込み、破損したエントリも期限切れとして数える
+        """
+        cutoff = time.time() - self.ttl.total_seconds()
+        with self._lock:
+            total_files, total_size, expired_files = self._conn.execute(
+                "SELECT count(*), coalesce(sum(length(payload)), 0), coalesce(sum(ts < ?), 0) FROM transcripts",
+                (cutoff,)
+            ).fetchone()
+            
+            if deep:
+                expired_files += sum(
+                    not self._is_readable(payload)
+                    for (payload,) in self._conn.execute(
+                        "SELECT payload FROM transcripts WHERE ts >= ?", (cutoff,)
+                    )
+                )
+        
+        return {
+            'total_files': total_files,
+            'total_size_bytes': total_size,
+            'total_size_mb': round(total_size / (1024 * 1024), 2),
+            'expired_files': expired_files,
+            'valid_files': total_files - expired_files,
+            'cache_dir': self.cache_dir,
+            'db_path': self.db_path,
+            'ttl_hours': self.ttl.total_seconds() / 3600
+        }
+    
+    def _is_readable(self, payload: bytes) -> bool:
+        """保存された結果が読み込み可能か確認"""
+        try:
+            self._decode_payload(payload, "")
+            return True
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            return False
+    
+    def close(self):
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
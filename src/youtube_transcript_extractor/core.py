@@ -4,16 +4,35 @@ Core classes and functions for YouTube transcript extraction
 
 import os
 import re
+import sys
 import time
 import logging
-from typing import List, Dict, Optional, Union
+import threading
+from collections import deque
+from operator import attrgetter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
+if TYPE_CHECKING:
+    from .cache import TranscriptCache
+    from .extractors import BaseExtractor
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# デフォルト値を持つdataclassに__slots__を付けられるのはPython 3.10以降（dataclass(slots=True)）
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# SRTの1ブロック分のテンプレート（番号, 開始時刻, 終了時刻, テキスト）
+_SRT_BLOCK = "{0}\n{1} --> {2}\n{3}\n".format
+
+# 動画ID抽出パターン（watch / embed / youtu.be を1つの選択で扱う。IDは11文字ちょうどで、
+# 12文字目以降が続く不正なIDから別の動画のIDを切り出さない）
+_VIDEO_ID_RE = re.compile(r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/)|youtu\.be/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])')
+
 
 class TranscriptMethod(Enum):
     """文字起こし取得手法の列挙"""
@@ -24,9 +43,20 @@ class TranscriptMethod(Enum):
     ASSEMBLY_AI = "assembly_ai"
 
 
-@dataclass
+# 音声をダウンロードして有料APIで認識する手法。開始すると途中で止められず課金されるため、
+# 並行実行（ヘッジ）せず、実行中の手法がすべて失敗してから開始する
+COSTLY_METHODS = frozenset({
+    TranscriptMethod.OPENAI_WHISPER,
+    TranscriptMethod.DEEPGRAM,
+    TranscriptMethod.ASSEMBLY_AI,
+})
+
+
+@dataclass(frozen=True)
 class TranscriptEntry:
-    """文字起こしエントリ"""
+    """文字起こしエントリ（不変）"""
+    __slots__ = ("text", "start_time", "end_time")
+    
     text: str
     start_time: float
     end_time: float
@@ -37,9 +67,13 @@ class TranscriptEntry:
             "start_time": self.start_time,
             "end_time": self.end_time
         }
+    
+    def __reduce__(self):
+        # frozenかつ__slots__のため、pickle/copyは属性代入ではなくコンストラクタで復元する
+        return (self.__class__, (self.text, self.start_time, self.end_time))
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TranscriptResult:
     """文字起こし結果"""
     entries: List[TranscriptEntry]
@@ -53,21 +87,31 @@ class TranscriptResult:
         """プレーンテキストに変換"""
         return " ".join([entry.text for entry in self.entries])
     
+    @property
+    def total_text_length(self) -> int:
+        """to_plain_text()の文字数（文字列を生成せずに計算）"""
+        return sum(len(entry.text) for entry in self.entries) + max(0, len(self.entries) - 1)
+    
     def to_srt(self) -> str:
         """SRT形式に変換"""
-        srt_content = []
-        for i, entry in enumerate(self.entries, 1):
-            start_time = self._format_srt_time(entry.start_time)
-            end_time = self._format_srt_time(entry.end_time)
-            srt_content.append(f"{i}\n{start_time} --> {end_time}\n{entry.text}\n")
-        return "\n".join(srt_content)
-    
-    def _format_srt_time(self, seconds: float) -> str:
+        # ループをmap（C実装）に任せ、Pythonレベルのforを回さない
+        entries = self.entries
+        fmt = self._format_srt_time
+        return "\n".join(map(
+            _SRT_BLOCK,
+            range(1, len(entries) + 1),
+            map(fmt, map(attrgetter("start_time"), entries)),
+            map(fmt, map(attrgetter("end_time"), entries)),
+            map(attrgetter("text"), entries)
+        ))
+    
+    @staticmethod
+    def _format_srt_time(seconds: float) -> str:
         """秒数をSRT時間フォーマットに変換"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        ms = int((seconds % 1) * 1000)
+        # ミリ秒の整数に丸めてからdivmodで分解する（浮動小数点の剰余による1ms欠けを防ぐ）
+        secs, ms = divmod(round(seconds * 1000), 1000)
+        minutes, secs = divmod(secs, 60)
+        hours, minutes = divmod(minutes, 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
 
 
@@ -95,8 +139,10 @@ class TranscriptConfig:
     
     # パフォーマンス設定
     max_concurrent_requests: int = 5
+    max_workers: Optional[int] = None  # 非同期抽出器の同時処理数（Noneで自動）
     request_timeout: int = 30
     retry_attempts: int = 3
+    hedge_delay: float = 2.0  # 次のフォールバック手法を並行して開始するまでの待ち時間（秒、COSTLY_METHODSは並行開始しない）
     
     def __post_init__(self):
         if self.fallback_languages is None:
@@ -137,8 +183,17 @@ class YouTubeTranscriptExtractor:
         # ログ設定
         self._setup_logging()
         
-        # 抽出器を初期化
-        self.extractors = self._initialize_extractors()
+        # 抽出器（使用する手法のものだけを初回使用時に作成する）
+        self.extractors: Dict[TranscriptMethod, "BaseExtractor"] = {}
+        
+        # フォールバック手法を並行実行するスレッドプール（初回使用時に作成）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # 結果キャッシュ（enable_cache時、初回使用時に作成）
+        self._cache: Optional["TranscriptCache"] = None
+        
+        # get_transcriptsの複数スレッドから同時に初回使用されても1つだけ作成するためのロック
+        self._init_lock = threading.Lock()
     
     def _setup_logging(self):
         """ログ設定のセットアップ"""
@@ -153,44 +208,27 @@ class YouTubeTranscriptExtractor:
             handler.setFormatter(formatter)
             logger.addHandler(handler)
     
-    def _initialize_extractors(self) -> Dict[TranscriptMethod, object]:
-        """抽出器を初期化"""
-        from .extractors import (
-            YouTubeTranscriptAPIExtractor,
-            InnerTubeAPIExtractor,
-            OpenAIWhisperExtractor,
-            DeepgramExtractor,
-            AssemblyAIExtractor,
-        )
-        
-        extractors = {}
-        
-        for method in self.config.fallback_methods:
-            if method == TranscriptMethod.YOUTUBE_TRANSCRIPT_API:
-                extractors[method] = YouTubeTranscriptAPIExtractor(self.config)
-            elif method == TranscriptMethod.INNERTUBE_API:
-                extractors[method] = InnerTubeAPIExtractor(self.config)
-            elif method == TranscriptMethod.OPENAI_WHISPER:
-                extractors[method] = OpenAIWhisperExtractor(self.config)
-            elif method == TranscriptMethod.DEEPGRAM:
-                extractors[method] = DeepgramExtractor(self.config)
-            elif method == TranscriptMethod.ASSEMBLY_AI:
-                extractors[method] = AssemblyAIExtractor(self.config)
-        
-        return extractors
-    
-    def extract_video_id(self, url_or_id: str) -> str:
+    def _get_extractor(self, method: TranscriptMethod) -> Optional["BaseExtractor"]:
+        """手法の抽出器を取得（初回使用時に作成）"""
+        extractor = self.extractors.get(method)
+        if extractor is None:
+            from .extractors import EXTRACTOR_CLASSES
+            
+            extractor_class = EXTRACTOR_CLASSES.get(method)
+            if extractor_class is None:
+                return None
+            extractor = self.extractors.setdefault(method, extractor_class(self.config))
+        return extractor
+    
+    @staticmethod
+    def extract_video_id(url_or_id: str) -> str:
         """YouTube URLまたはIDから動画IDを抽出"""
         if len(url_or_id) == 11 and "/" not in url_or_id:
             return url_or_id
         
-        patterns = [
-            r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\n?#]+)',
-            r'youtube\.com/watch\?.*v=([^&\n?#]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url_or_id)
+        # YouTubeのURLでなければ正規表現を使わずに弾く
+        if "youtu" in url_or_id:
+            match = _VIDEO_ID_RE.search(url_or_id)
             if match:
                 return match.group(1)
         
@@ -210,32 +248,62 @@ class YouTubeTranscriptExtractor:
         video_id = self.extract_video_id(video_url_or_id)
         target_language = language or self.config.preferred_language
         
-        logger.info(f"Extracting transcript for video: {video_id}, language: {target_language}")
+        logger.info("Extracting transcript for video: %s, language: %s", video_id, target_language)
         
-        # フォールバック手法を順次試行
+        cache = self._get_cache()
+        if cache is not None:
+            cached = cache.get(video_id, target_language)
+            if cached is not None:
+                logger.info("Cache hit for video: %s, language: %s", video_id, target_language)
+                return cached
+        
+        # 抽出器は試行前に一度だけ解決し、(フォールバック順, 手法, 抽出器) として保持する
+        candidates = []
         for method in self.config.fallback_methods:
-            try:
-                logger.info(f"Trying method: {method.value}")
-                start_time = time.time()
-                
-                extractor = self.extractors.get(method)
-                if not extractor:
-                    logger.warning(f"Extractor not available for method: {method.value}")
+            extractor = self._get_extractor(method)
+            if extractor:
+                candidates.append((len(candidates), method, extractor))
+            else:
+                logger.warning("Extractor not available for method: %s", method.value)
+        
+        # 先頭の手法から開始し、失敗するかhedge_delay秒応答がなければ次の手法を並行して開始する。
+        # 最初に成功した結果を返す（実行中の他の手法はバックグラウンドで完了させる）。
+        # COSTLY_METHODSは並行開始せず、実行中の手法がすべて失敗してから開始する
+        remaining = deque(candidates)
+        pending: Dict[Future, Tuple[int, TranscriptMethod]] = {}
+        
+        def launch_next():
+            if not remaining or (pending and remaining[0][1] in COSTLY_METHODS):
+                return
+            order, method, extractor = remaining.popleft()
+            future = self._get_executor().submit(self._run_method, method, extractor, video_id, target_language)
+            pending[future] = (order, method)
+        
+        launch_next()
+        while pending:
+            done, _ = wait(list(pending), timeout=self.config.hedge_delay, return_when=FIRST_COMPLETED)
+            
+            # 同時に完了した場合はフォールバック順の早い手法を優先
+            for future in sorted(done, key=lambda f: pending[f][0]):
+                _, method = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error("Method %s raised exception: %s", method.value, e)
                     continue
                 
-                result = extractor.extract(video_id, target_language)
-                processing_time = time.time() - start_time
-                result.processing_time = processing_time
-                
                 if result.success:
-                    logger.info(f"Successfully extracted transcript using {method.value} in {processing_time:.2f}s")
+                    logger.info("Successfully extracted transcript using %s in %.2fs", method.value, result.processing_time)
+                    for other in pending:
+                        other.cancel()
+                    if cache is not None:
+                        cache.set(video_id, target_language, result)
                     return result
                 else:
-                    logger.warning(f"Method {method.value} failed: {result.error_message}")
-                    
-            except Exception as e:
-                logger.error(f"Method {method.value} raised exception: {str(e)}")
-                continue
+                    logger.warning("Method %s failed: %s", method.value, result.error_message)
+            
+            # 失敗した手法があれば即座に、応答待ちならhedge_delay経過後に次の手法を開始
+            launch_next()
         
         # すべての手法が失敗した場合
         return TranscriptResult(
@@ -245,4 +313,94 @@ class YouTubeTranscriptExtractor:
             success=False,
             error_message="All extraction methods failed"
         )
-
+    
+    def get_transcripts(
+        self,
+        video_urls_or_ids: List[str],
+        language: Optional[str] = None,
+        max_workers: Optional[int] = None
+    ) -> List[Union[TranscriptResult, Exception]]:
+        """
+        複数動画の文字起こしをスレッドプールで並行取得
+        
+        Args:
+            video_urls_or_ids: YouTube URL または動画IDのリスト
+            language: 言語コード（省略時は設定値を使用）
+            max_workers: 同時に処理する動画数（省略時はmax_concurrent_requests）
+        
+        Returns:
+            List[Union[TranscriptResult, Exception]]: 入力順の結果のリスト（例外は要素として返す）
+        """
+        def fetch(video_url_or_id: str) -> Union[TranscriptResult, Exception]:
+            try:
+                return self.get_transcript(video_url_or_id, language)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(
+            max_workers=max_workers or self.config.max_concurrent_requests,
+            thread_name_prefix="transcript-batch"
+        ) as executor:
+            return list(executor.map(fetch, video_urls_or_ids))
+    
+    def _run_method(
+        self,
+        method: TranscriptMethod,
+        extractor: "BaseExtractor",
+        video_id: str,
+        language: str
+    ) -> TranscriptResult:
+        """1つの手法で文字起こしを取得（スレッドプール上で実行）"""
+        logger.info("Trying method: %s", method.value)
+        start_time = time.time()
+        
+        result = extractor.extract(video_id, language)
+        result.processing_time = time.time() - start_time
+        return result
+    
+    def _get_cache(self) -> Optional["TranscriptCache"]:
+        """結果キャッシュを取得（無効な場合はNone）"""
+        if not self.config.enable_cache:
+            return None
+        
+        if self._cache is None:
+            with self._init_lock:
+                if self._cache is None:
+                    from .cache import TranscriptCache
+                    self._cache = TranscriptCache(self.config.cache_dir, self.config.cache_ttl_hours)
+        return self._cache
+    
+    def close(self, wait: bool = True):
+        """
+        フォールバック用スレッドプールを停止し、書き込み待ちのキャッシュを保存
+        
+        Args:
+            wait: 実行中の手法（ヘッジで負けた手法を含む）の完了を待つか
+        """
+        with self._init_lock:
+            executor, self._executor = self._executor, None
+            cache, self._cache = self._cache, None
+        
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if cache is not None:
+            cache.close()
+    
+    def __enter__(self):
+        """コンテキストマネージャーのエントリ"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """コンテキストマネージャーの終了"""
+        self.close()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """フォールバック用スレッドプールを取得"""
+        if self._executor is None:
+            with self._init_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(1, len(self.config.fallback_methods)) * self.config.max_concurrent_requests,
+                        thread_name_prefix="transcript-fallback"
+                    )
+        return self._executor
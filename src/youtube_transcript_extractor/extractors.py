@@ -2,13 +2,21 @@
 Individual transcript extractors for different methods
 """
 
+import io
 import os
 import re
+import html
 import time
+import shutil
+import tempfile
+import threading
 import logging
+import orjson
 import requests
 from abc import ABC, abstractmethod
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Optional, Tuple
 from xml.etree import ElementTree as ET
 
 from .core import TranscriptResult, TranscriptEntry, TranscriptMethod, TranscriptConfig
@@ -16,12 +24,44 @@ from .exceptions import TranscriptError, NoTranscriptAvailableError
 
 logger = logging.getLogger(__name__)
 
+# 動画ページHTMLからInnerTube APIキーを抽出するパターン（デコードせずバイト列のまま1回の走査で検索する）
+_API_KEY_RE = re.compile(
+    rb'"INNERTUBE_API_KEY":"(?P<a>[^"]+)"'
+    rb'|"innertubeApiKey":"(?P<b>[^"]+)"'
+    rb'|INNERTUBE_API_KEY["\s]*:["\s]*(?P<c>[^"\s,}]+)'
+)
+
+
+def _iter_text_elements(xml_content: bytes):
+    """キャプションXMLの<text>要素を順に返す（使用後の要素は解放する）"""
+    for _, elem in ET.iterparse(io.BytesIO(xml_content), events=("end",)):
+        if elem.tag == "text":
+            yield elem
+            elem.clear()
+
 
 class BaseExtractor(ABC):
     """抽出器の基底クラス"""
     
+    # 一時的な障害とみなして再試行するHTTPステータス
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
     def __init__(self, config: TranscriptConfig):
         self.config = config
+        
+        # 接続（TCP/TLS）を再利用するため、抽出器ごとにセッションを保持する
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=self.config.retry_attempts,
+                backoff_factor=0.3,
+                status_forcelist=self.RETRY_STATUSES
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
     @abstractmethod
     def extract(self, video_id: str, language: str) -> TranscriptResult:
@@ -32,11 +72,22 @@ class BaseExtractor(ABC):
 class YouTubeTranscriptAPIExtractor(BaseExtractor):
     """youtube-transcript-apiを使用した抽出器"""
     
-    def extract(self, video_id: str, language: str) -> TranscriptResult:
+    def __init__(self, config: TranscriptConfig):
+        super().__init__(config)
+        
+        # 抽出のたびにimportしないよう、インスタンス作成時に一度だけ読み込む
         try:
             from youtube_transcript_api import YouTubeTranscriptApi
             from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
         except ImportError:
+            self._api = None
+        else:
+            self._api = YouTubeTranscriptApi
+            self._expected_errors = (TranscriptsDisabled, NoTranscriptFound)
+            self._no_transcript_found = NoTranscriptFound
+    
+    def extract(self, video_id: str, language: str) -> TranscriptResult:
+        if self._api is None:
             return TranscriptResult(
                 entries=[], method=TranscriptMethod.YOUTUBE_TRANSCRIPT_API,
                 language=language, success=False,
@@ -45,12 +96,12 @@ class YouTubeTranscriptAPIExtractor(BaseExtractor):
         
         try:
             # 利用可能な言語を取得
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+            transcript_list = self._api.list_transcripts(video_id)
             
             # 指定言語を試行
             try:
                 transcript = transcript_list.find_transcript([language])
-            except NoTranscriptFound:
+            except self._no_transcript_found:
                 # 英語にフォールバック
                 if language != "en":
                     transcript = transcript_list.find_transcript(["en"])
@@ -75,7 +126,7 @@ class YouTubeTranscriptAPIExtractor(BaseExtractor):
                 success=True
             )
             
-        except (TranscriptsDisabled, NoTranscriptFound) as e:
+        except self._expected_errors as e:
             return TranscriptResult(
                 entries=[], method=TranscriptMethod.YOUTUBE_TRANSCRIPT_API,
                 language=language, success=False,
@@ -92,114 +143,69 @@ class YouTubeTranscriptAPIExtractor(BaseExtractor):
 class InnerTubeAPIExtractor(BaseExtractor):
     """InnerTube APIを使用した抽出器"""
     
+    WATCH_URL = "https://www.youtube.com/watch?v={video_id}"
+    PLAYER_URL = "https://www.youtube.com/youtubei/v1/player?key={api_key}"
+    
+    _HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    }
+    
+    # player APIのクライアントコンテキスト（全リクエストで共通）
+    _PLAYER_CTX = {
+        "context": {
+            "client": {
+                "clientName": "ANDROID",
+                "clientVersion": "20.10.38"
+            }
+        }
+    }
+    
+    # APIキーはほぼ固定のため、動画ページの取得を省けるようプロセス内で共有する（同期版・非同期版共通）
+    API_KEY_TTL_SECONDS = 3600
+    # キャッシュしたキーが拒否されたとみなすplayer APIのステータス
+    KEY_REJECTED_STATUSES = (400, 401, 403)
+    
+    _cached_api_key: Optional[str] = None
+    _cached_api_key_time: float = 0.0
+    _api_key_lock = threading.Lock()
+    # キャッシュミス時に動画ページの取得を1スレッドに限定するロック（_api_key_lockとは別に、取得中も保持する）
+    _api_key_fetch_lock = threading.Lock()
+    
+    def __init__(self, config: TranscriptConfig):
+        super().__init__(config)
+        self.session.headers.update(self._HEADERS)
+    
     def extract(self, video_id: str, language: str) -> TranscriptResult:
         try:
-            # 動画ページからAPIキーを取得
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            
-            response = requests.get(video_url, headers=headers, timeout=self.config.request_timeout)
-            response.raise_for_status()
-            html = response.text
-            
-            # APIキーを抽出
-            api_key_patterns = [
-                r'"INNERTUBE_API_KEY":"([^"]+)"',
-                r'"innertubeApiKey":"([^"]+)"',
-                r'INNERTUBE_API_KEY["\s]*:["\s]*([^"]+)',
-            ]
-            
-            api_key = None
-            for pattern in api_key_patterns:
-                match = re.search(pattern, html)
-                if match:
-                    api_key = match.group(1)
-                    break
-            
-            if not api_key:
-                raise Exception("INNERTUBE_API_KEY not found in video page")
+            api_key, from_cache = self._get_api_key(video_id)
             
             # InnerTube player APIを呼び出し
-            player_url = f"https://www.youtube.com/youtubei/v1/player?key={api_key}"
-            player_data = {
-                "context": {
-                    "client": {
-                        "clientName": "ANDROID",
-                        "clientVersion": "20.10.38"
-                    }
-                },
-                "videoId": video_id
-            }
-            
-            response = requests.post(
-                player_url, 
-                json=player_data, 
-                headers=headers,
-                timeout=self.config.request_timeout
-            )
+            response = self._post_player(api_key, video_id)
+            if from_cache and response.status_code in self.KEY_REJECTED_STATUSES:
+                # キャッシュしたキーが失効した場合は取り直して一度だけ再試行
+                api_key, _ = self._get_api_key(video_id, rejected=api_key)
+                response = self._post_player(api_key, video_id)
             response.raise_for_status()
-            player_response = response.json()
+            player_response = orjson.loads(response.content)
             
             # キャプショントラックを取得
-            captions = player_response.get("captions", {})
-            tracks = captions.get("playerCaptionsTracklistRenderer", {}).get("captionTracks", [])
-            
+            tracks = self._get_caption_tracks(player_response)
             if not tracks:
                 raise Exception("No caption tracks found")
             
-            # 指定言語のトラックを検索
-            target_track = None
-            for track in tracks:
-                if track.get("languageCode") == language:
-                    target_track = track
-                    break
-            
-            # 英語にフォールバック
-            if not target_track and language != "en":
-                for track in tracks:
-                    if track.get("languageCode") == "en":
-                        target_track = track
-                        break
-            
-            # 最初のトラックを使用
-            if not target_track:
-                target_track = tracks[0]
+            target_track = self._select_track(tracks, language)
             
             # キャプションXMLを取得
-            base_url = target_track["baseUrl"].replace("&fmt=srv3", "")
-            xml_response = requests.get(base_url, timeout=self.config.request_timeout)
+            xml_response = self.session.get(self._caption_url(target_track), timeout=self.config.request_timeout)
             xml_response.raise_for_status()
-            xml_content = xml_response.text
-            
-            # XMLを解析
-            root = ET.fromstring(xml_content)
-            entries = []
-            
-            for text_elem in root.findall("text"):
-                start = float(text_elem.get("start", 0))
-                duration = float(text_elem.get("dur", 0))
-                text = text_elem.text or ""
-                
-                # HTMLエンティティをデコード
-                import html
-                text = html.unescape(text)
-                
-                entries.append(TranscriptEntry(
-                    text=text,
-                    start_time=start,
-                    end_time=start + duration
-                ))
             
             return TranscriptResult(
-                entries=entries,
+                entries=self._parse_caption_xml(xml_response.content),
                 method=TranscriptMethod.INNERTUBE_API,
                 language=target_track.get("languageCode", language),
                 success=True
@@ -217,6 +223,118 @@ class InnerTubeAPIExtractor(BaseExtractor):
                 language=language, success=False,
                 error_message=f"InnerTube API error: {str(e)}"
             )
+    
+    def _get_api_key(self, video_id: str, rejected: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        APIキーを取得（キャッシュになければ動画ページから取得）
+        
+        複数のスレッドが同時にキャッシュミスしても、動画ページの取得は1回にまとめる。
+        
+        Args:
+            video_id: キーの取得に使う動画ID
+            rejected: player APIに拒否されたキー（キャッシュから破棄して取り直す）
+        
+        Returns:
+            Tuple[str, bool]: (APIキー, キャッシュから取得したか)
+        """
+        if rejected is not None:
+            self._invalidate_api_key(rejected)
+        
+        api_key = self._get_cached_api_key()
+        if api_key is None:
+            with self._api_key_fetch_lock:
+                # 待っている間に他のスレッドが取得していればそのキーを使う
+                api_key = self._get_cached_api_key()
+                if api_key is None:
+                    return self._fetch_api_key(video_id), False
+        return api_key, True
+    
+    def _fetch_api_key(self, video_id: str) -> str:
+        """動画ページからAPIキーを取得し、キャッシュに保存"""
+        response = self.session.get(self.WATCH_URL.format(video_id=video_id), timeout=self.config.request_timeout)
+        response.raise_for_status()
+        
+        api_key = self._find_api_key(response.content)
+        if not api_key:
+            raise Exception("INNERTUBE_API_KEY not found in video page")
+        
+        self._store_api_key(api_key)
+        return api_key
+    
+    def _post_player(self, api_key: str, video_id: str) -> requests.Response:
+        """player APIを呼び出す"""
+        return self.session.post(
+            self.PLAYER_URL.format(api_key=api_key),
+            json=self._build_player_data(video_id),
+            timeout=self.config.request_timeout
+        )
+    
+    # 以下のヘルパーは同期版と非同期版（AsyncYouTubeTranscriptExtractor）で共有する
+    
+    @classmethod
+    def _get_cached_api_key(cls) -> Optional[str]:
+        """有効期限内のキャッシュ済みAPIキーを取得"""
+        with cls._api_key_lock:
+            if cls._cached_api_key and time.time() - cls._cached_api_key_time < cls.API_KEY_TTL_SECONDS:
+                return cls._cached_api_key
+        return None
+    
+    @classmethod
+    def _store_api_key(cls, api_key: str):
+        """APIキーをキャッシュに保存"""
+        with cls._api_key_lock:
+            InnerTubeAPIExtractor._cached_api_key = api_key
+            InnerTubeAPIExtractor._cached_api_key_time = time.time()
+    
+    @classmethod
+    def _invalidate_api_key(cls, api_key: str):
+        """拒否されたAPIキーをキャッシュから破棄（他で更新済みなら何もしない）"""
+        with cls._api_key_lock:
+            if InnerTubeAPIExtractor._cached_api_key == api_key:
+                InnerTubeAPIExtractor._cached_api_key = None
+    
+    @staticmethod
+    def _find_api_key(html: bytes) -> Optional[str]:
+        """動画ページのHTML（バイト列）からAPIキーを抽出"""
+        match = _API_KEY_RE.search(html)
+        if not match:
+            return None
+        return (match.group('a') or match.group('b') or match.group('c')).decode('ascii', 'replace')
+    
+    @classmethod
+    def _build_player_data(cls, video_id: str) -> dict:
+        """player APIのリクエストボディを生成（コンテキストは共有し浅いコピーのみ作成）"""
+        return {**cls._PLAYER_CTX, "videoId": video_id}
+    
+    @staticmethod
+    def _get_caption_tracks(player_response: dict) -> List[dict]:
+        """player APIのレスポンスからキャプショントラックを取得"""
+        captions = player_response.get("captions", {})
+        return captions.get("playerCaptionsTracklistRenderer", {}).get("captionTracks", [])
+    
+    @staticmethod
+    def _select_track(tracks: List[dict], language: str) -> dict:
+        """指定言語 → 英語 → 先頭の順でトラックを選択"""
+        # 言語コードごとの索引（同じ言語が複数ある場合は先に現れたトラックを優先）
+        by_lang = {track.get("languageCode"): track for track in reversed(tracks)}
+        return by_lang.get(language) or by_lang.get("en") or tracks[0]
+    
+    @staticmethod
+    def _caption_url(track: dict) -> str:
+        """キャプションXMLのURLを取得"""
+        return track["baseUrl"].replace("&fmt=srv3", "")
+    
+    @staticmethod
+    def _parse_caption_xml(xml_content: bytes) -> List[TranscriptEntry]:
+        """キャプションXMLを解析（ツリーを保持せず要素ごとに逐次処理）"""
+        _float = float
+        _entry = TranscriptEntry
+        unescape = html.unescape  # HTMLエンティティをデコード
+        
+        return [
+            _entry(unescape(elem.text or ""), start := _float(elem.get("start", "0")), start + _float(elem.get("dur", "0")))
+            for elem in _iter_text_elements(xml_content)
+        ]
 
 
 class OpenAIWhisperExtractor(BaseExtractor):
@@ -239,9 +357,10 @@ class OpenAIWhisperExtractor(BaseExtractor):
                 error_message="openai package not installed"
             )
         
+        temp_dir = None
         try:
             # 音声ファイルをダウンロード
-            audio_file_path = self._download_audio(video_id)
+            audio_file_path, temp_dir = self._download_audio(video_id)
             
             # Whisper APIで文字起こし
             client = openai.OpenAI(api_key=self.config.openai_api_key)
@@ -271,10 +390,6 @@ class OpenAIWhisperExtractor(BaseExtractor):
                     end_time=0.0
                 ))
             
-            # 一時ファイルを削除
-            if os.path.exists(audio_file_path):
-                os.unlink(audio_file_path)
-            
             return TranscriptResult(
                 entries=entries,
                 method=TranscriptMethod.OPENAI_WHISPER,
@@ -288,39 +403,62 @@ class OpenAIWhisperExtractor(BaseExtractor):
                 language=language, success=False,
                 error_message=f"OpenAI Whisper error: {str(e)}"
             )
+        finally:
+            # 一時ディレクトリごと削除
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
     
-    def _download_audio(self, video_id: str) -> str:
-        """音声ファイルをダウンロード"""
+    def _download_audio(self, video_id: str) -> Tuple[str, str]:
+        """
+        音声ファイルを一時ディレクトリにダウンロード
+        
+        Returns:
+            Tuple[str, str]: (音声ファイルのパス, 一時ディレクトリ) 一時ディレクトリは呼び出し側で削除する
+        """
         try:
             import yt_dlp
-            import tempfile
         except ImportError:
             raise Exception("yt-dlp package not installed")
         
-        with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = tempfile.mkdtemp(prefix='yte_')
+        try:
             ydl_opts = {
                 'format': 'bestaudio/best',
-                'extractaudio': True,
-                'audioformat': 'mp3',
                 'outtmpl': os.path.join(temp_dir, '%(id)s.%(ext)s'),
                 'quiet': True,
                 'no_warnings': True
             }
+            if shutil.which('ffmpeg'):
+                # 音声のみを24kbpsのOpusに変換し、アップロードサイズを抑える
+                ydl_opts['postprocessors'] = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'opus',
+                    'preferredquality': '24'
+                }]
+            else:
+                # ffmpegがなければ変換せず、Whisper APIが受け付けるm4a/webmの音声をそのまま使う
+                logger.info("ffmpeg not found, uploading the original audio stream without re-encoding")
+                ydl_opts['format'] = 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best'
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 url = f"https://www.youtube.com/watch?v={video_id}"
                 ydl.download([url])
             
-            # ダウンロードされたファイルを検索
+            # ダウンロードされたファイルを検索（コピーせずその場のパスを返す）
             for file in os.listdir(temp_dir):
                 if file.startswith(video_id):
-                    # 一時ディレクトリ外にコピー
-                    import shutil
-                    dest_path = f"/tmp/{file}"
-                    shutil.copy2(os.path.join(temp_dir, file), dest_path)
-                    return dest_path
+                    audio_path = os.path.join(temp_dir, file)
+                    # Whisper APIは.opus拡張子を受け付けないため、同じOgg形式の.oggとして渡す
+                    if file.endswith('.opus'):
+                        ogg_path = audio_path[:-len('.opus')] + '.ogg'
+                        os.replace(audio_path, ogg_path)
+                        audio_path = ogg_path
+                    return audio_path, temp_dir
             
             raise Exception("Downloaded audio file not found")
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
 
 
 class DeepgramExtractor(BaseExtractor):
@@ -344,3 +482,12 @@ class AssemblyAIExtractor(BaseExtractor):
             error_message="AssemblyAI implementation not completed"
         )
 
+
+# 手法ごとの抽出器クラス（YouTubeTranscriptExtractorが初回使用時にインスタンス化する）
+EXTRACTOR_CLASSES = {
+    TranscriptMethod.YOUTUBE_TRANSCRIPT_API: YouTubeTranscriptAPIExtractor,
+    TranscriptMethod.INNERTUBE_API: InnerTubeAPIExtractor,
+    TranscriptMethod.OPENAI_WHISPER: OpenAIWhisperExtractor,
+    TranscriptMethod.DEEPGRAM: DeepgramExtractor,
+    TranscriptMethod.ASSEMBLY_AI: AssemblyAIExtractor,
+}
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Tests for async functionality
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+from unittest.mock import Mock, patch
+
+import aiohttp
+import orjson
+
+# パッケージのパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from youtube_transcript_extractor import (
+    AsyncYouTubeTranscriptExtractor,
+    InnerTubeAPIExtractor,
+    run_async,
+    TranscriptResult,
+    TranscriptEntry,
+    TranscriptMethod,
+    TranscriptConfig,
+)
+
+
+def make_result(text: str = "Hello") -> TranscriptResult:
+    """テスト用の文字起こし結果を作成"""
+    return TranscriptResult(
+        entries=[TranscriptEntry(text, 0.0, 1.0)],
+        method=TranscriptMethod.INNERTUBE_API,
+        language="en",
+        success=True
+    )
+
+
+class TestGetMultipleTranscripts(unittest.IsolatedAsyncioTestCase):
+    """get_multiple_transcriptsのテスト"""
+    
+    async def asyncSetUp(self):
+        """動画ごとの処理時間を指定できるスタブを設定"""
+        self.extractor = AsyncYouTubeTranscriptExtractor(max_workers=2)
+        self.delays = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        
+        async def fake_get_transcript(video_id, language="en"):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.delays.get(video_id, 0))
+                if video_id == "error":
+                    raise RuntimeError("boom")
+                return make_result(video_id)
+            finally:
+                self.in_flight -= 1
+        
+        self.extractor.get_transcript_async = fake_get_transcript
+    
+    async def asyncTearDown(self):
+        """セッションを閉じる"""
+        await self.extractor.close()
+    
+    async def test_invalid_batch_size(self):
+        """1未満や整数以外のbatch_sizeを拒否するテスト"""
+        for batch_size in (0, -1, 1.5, True, "large"):
+            with self.subTest(batch_size=batch_size):
+                with self.assertRaises(ValueError):
+                    await self.extractor.get_multiple_transcripts(["a"], batch_size=batch_size)
+    
+    async def test_results_keep_input_order(self):
+        """完了順に関わらず入力順に結果（例外を含む）を返すテスト"""
+        self.delays = {"a": 0.03, "b": 0.01}
+        video_ids = ["a", "b", "error", "c"]
+        
+        for batch_size in ("auto", 1, 2, None):
+            with self.subTest(batch_size=batch_size):
+                results = await self.extractor.get_multiple_transcripts(video_ids, batch_size=batch_size)
+                
+                self.assertEqual([r.to_plain_text() for r in results if isinstance(r, TranscriptResult)], ["a", "b", "c"])
+                self.assertIsInstance(results[2], RuntimeError)
+    
+    async def test_sliding_window(self):
+        """同時実行数をbatch_sizeに抑えつつ、遅い動画の完了を待たずに次を開始するテスト"""
+        video_ids = []
+        for i in range(4):
+            self.delays[f"slow{i}"] = 0.1
+            video_ids += [f"slow{i}", f"fast{i}"]
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await self.extractor.get_multiple_transcripts(video_ids, batch_size=2)
+        elapsed = loop.time() - start
+        
+        self.assertEqual(len(results), len(video_ids))
+        self.assertEqual(self.max_in_flight, 2)
+        # 2件ずつのバッチで待つと遅い動画4件が直列になり0.4秒かかる
+        self.assertLess(elapsed, 0.3)
+
+
+class FakeStream:
+    """少しずつ読み出すaiohttp.StreamReaderのスタブ"""
+    
+    def __init__(self, body: bytes, chunk_size: int = 7):
+        self.body = body
+        self.chunk_size = chunk_size
+    
+    async def read(self, n: int = -1) -> bytes:
+        size = self.chunk_size if n < 0 else min(n, self.chunk_size)
+        chunk, self.body = self.body[:size], self.body[size:]
+        return chunk
+
+
+class FakeResponse:
+    """ステータスとヘッダーを指定できるaiohttpレスポンスのスタブ"""
+    
+    def __init__(self, status: int, headers: dict = None, body: bytes = b"ok"):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+        self.content = FakeStream(body)
+    
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                Mock(url=Mock(host="www.youtube.com")), (),
+                status=self.status, headers=self.headers
+            )
+    
+    async def read(self) -> bytes:
+        return self.body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class FakeSession:
+    """用意したレスポンスを順に返すClientSessionのスタブ"""
+    
+    def __init__(self, responses: list):
+        self.responses = list(responses)
+        self.calls = []
+    
+    def request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        self.calls.append((method, url))
+        return self.responses.pop(0)
+
+
+class CountingLimiter:
+    """取得回数を数えるAsyncLimiterのスタブ"""
+    
+    def __init__(self):
+        self.acquired = 0
+    
+    async def __aenter__(self):
+        self.acquired += 1
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class TestRequestRetry(unittest.IsolatedAsyncioTestCase):
+    """_requestの再試行・レート制限のテスト"""
+    
+    async def asyncSetUp(self):
+        """待機時間を記録するようasyncio.sleepを差し替え"""
+        self.extractor = AsyncYouTubeTranscriptExtractor(max_workers=2)
+        self.extractor._limiter = CountingLimiter()
+        self.delays = []
+        
+        async def fake_sleep(delay):
+            self.delays.append(delay)
+        
+        patcher = patch("youtube_transcript_extractor.async_extractor.asyncio.sleep", fake_sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    async def _request(self, session: FakeSession):
+        """レスポンス本文を読み出すリクエストを送信"""
+        return await self.extractor._request(session, "GET", "https://www.youtube.com/", lambda response: response.read())
+    
+    async def test_retry_on_429_and_503(self):
+        """429/503はRetry-Afterを優先して待機し再試行するテスト"""
+        session = FakeSession([
+            FakeResponse(429, {"Retry-After": "7"}),
+            FakeResponse(503),
+            FakeResponse(200, body=b"done"),
+        ])
+        
+        self.assertEqual(await self._request(session), b"done")
+        
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(self.delays[0], 7.0)
+        self.assertGreaterEqual(self.delays[1], 2.0)
+        self.assertLess(self.delays[1], 3.0)
+        # 再試行を含むすべての送信がレート制限を通る
+        self.assertEqual(self.extractor._limiter.acquired, 3)
+    
+    async def test_gives_up_after_max_retries(self):
+        """MAX_RETRIES回再試行しても失敗した場合は例外を送出するテスト"""
+        max_retries = self.extractor.MAX_RETRIES
+        session = FakeSession([FakeResponse(429) for _ in range(max_retries + 1)])
+        
+        with self.assertRaises(aiohttp.ClientResponseError) as cm:
+            await self._request(session)
+        
+        self.assertEqual(cm.exception.status, 429)
+        self.assertEqual(len(session.calls), max_retries + 1)
+        self.assertEqual(len(self.delays), max_retries)
+    
+    async def test_no_retry_on_other_errors(self):
+        """429/503以外のエラーは再試行しないテスト"""
+        session = FakeSession([FakeResponse(404), FakeResponse(200)])
+        
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await self._request(session)
+        
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(self.delays, [])
+    
+    def test_retry_delay(self):
+        """Retry-Afterが数値でなければ指数バックオフにフォールバックするテスト"""
+        retry_delay = AsyncYouTubeTranscriptExtractor._retry_delay
+        self.assertEqual(retry_delay(0, {"Retry-After": "3"}), 3.0)
+        for attempt, headers in ((0, None), (2, {}), (3, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})):
+            with self.subTest(attempt=attempt, headers=headers):
+                delay = retry_delay(attempt, headers)
+                self.assertGreaterEqual(delay, 2 ** attempt)
+                self.assertLess(delay, 2 ** attempt + 1)
+
+
+class InnerTubeSession:
+    """動画ページ・player API・キャプションXMLに応答するClientSessionのスタブ"""
+    
+    def __init__(self):
+        self.watch_fetches = 0
+        self.player_statuses = {}
+    
+    def request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        if url.startswith("https://www.youtube.com/watch"):
+            self.watch_fetches += 1
+            return DelayedResponse(200, body=b'{"INNERTUBE_API_KEY":"KEY%d"}' % self.watch_fetches)
+        if "/youtubei/v1/player" in url:
+            status = self.player_statuses.get(url.rsplit("key=", 1)[1], 200)
+            tracks = [{"languageCode": "en", "baseUrl": "https://www.youtube.com/api/timedtext?lang=en"}]
+            return FakeResponse(status, body=orjson.dumps({
+                "responseContext": {"visitorData": "x" * 50},
+                "captions": {"playerCaptionsTracklistRenderer": {"captionTracks": tracks}},
+            }))
+        return FakeResponse(200, body=b'<transcript><text start="0" dur="1">Hello</text></transcript>')
+
+
+class DelayedResponse(FakeResponse):
+    """本文の読み出しに時間のかかるレスポンス（取得中に他のタスクが割り込める）"""
+    
+    async def read(self) -> bytes:
+        await asyncio.sleep(0.01)
+        return self.body
+
+
+class TestInnerTubeAsync(unittest.IsolatedAsyncioTestCase):
+    """非同期版InnerTube APIのAPIキーキャッシュ・レスポンス解析のテスト"""
+    
+    async def asyncSetUp(self):
+        """キャッシュを空にし、通信をスタブに差し替えた抽出器を準備"""
+        InnerTubeAPIExtractor._cached_api_key = None
+        self.addCleanup(setattr, InnerTubeAPIExtractor, "_cached_api_key", None)
+        
+        self.session = InnerTubeSession()
+        self.extractor = AsyncYouTubeTranscriptExtractor(
+            TranscriptConfig(fallback_methods=[TranscriptMethod.INNERTUBE_API]),
+            max_workers=5
+        )
+        self.extractor._get_session = lambda: self.session
+    
+    async def test_read_caption_tracks(self):
+        """分割して届くplayer APIレスポンスからキャプショントラックだけを取り出すテスト"""
+        response = self.session.request("POST", "https://www.youtube.com/youtubei/v1/player?key=KEY")
+        
+        tracks = await AsyncYouTubeTranscriptExtractor._read_caption_tracks(response)
+        
+        self.assertEqual(tracks, [{"languageCode": "en", "baseUrl": "https://www.youtube.com/api/timedtext?lang=en"}])
+    
+    async def test_single_flight_on_cold_cache(self):
+        """同時にキャッシュミスしても動画ページは1回だけ取得するテスト"""
+        results = await self.extractor.get_multiple_transcripts([f"video{i:06d}" for i in range(5)])
+        
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(self.session.watch_fetches, 1)
+    
+    async def test_rejected_key_refetched_once(self):
+        """キャッシュしたキーが拒否されたら一度だけ取り直して再試行するテスト"""
+        InnerTubeAPIExtractor._store_api_key("KEY0")
+        self.session.player_statuses = {"KEY0": 403}
+        
+        result = await self.extractor._get_transcript_async(self.session, "video", "en")
+        
+        self.assertTrue(result.success)
+        self.assertEqual(result.to_plain_text(), "Hello")
+        self.assertEqual(self.session.watch_fetches, 1)
+        self.assertEqual(InnerTubeAPIExtractor._get_cached_api_key(), "KEY1")
+        
+        # 取り直したキーも拒否される場合は再試行を繰り返さない
+        self.session.player_statuses = {"KEY1": 403, "KEY2": 403}
+        result = await self.extractor._get_transcript_async(self.session, "video", "en")
+        self.assertFalse(result.success)
+        self.assertEqual(self.session.watch_fetches, 2)
+    
+    async def test_key_expires_after_ttl(self):
+        """有効期間を過ぎたキーは使わずに取り直すテスト"""
+        InnerTubeAPIExtractor._store_api_key("KEY0")
+        InnerTubeAPIExtractor._cached_api_key_time -= InnerTubeAPIExtractor.API_KEY_TTL_SECONDS + 1
+        
+        result = await self.extractor._get_transcript_async(self.session, "video", "en")
+        
+        self.assertTrue(result.success)
+        self.assertEqual(self.session.watch_fetches, 1)
+
+
+class TestSemaphore(unittest.TestCase):
+    """同時実行数セマフォのテスト"""
+    
+    def test_semaphore_follows_running_loop(self):
+        """イベントループ外で生成したインスタンスを複数のループで使えるテスト"""
+        extractor = AsyncYouTubeTranscriptExtractor(max_workers=2)
+        self.assertIsNone(extractor._sem)
+        
+        async def run():
+            with patch.object(extractor, "_get_transcript_with_fallback", return_value=make_result()):
+                results = await asyncio.gather(*(extractor.get_transcript_async("dQw4w9WgXcQ") for _ in range(4)))
+            return extractor._get_semaphore(), results
+        
+        first, results = asyncio.run(run())
+        second, _ = asyncio.run(run())
+        
+        self.assertTrue(all(result.success for result in results))
+        self.assertIsNot(first, second)
+
+
+class TestRunAsync(unittest.TestCase):
+    """run_asyncのテスト"""
+    
+    async def _loop_module(self):
+        """実行中のイベントループのクラスが定義されたモジュール名を返す"""
+        return type(asyncio.get_running_loop()).__module__
+    
+    def test_import_keeps_default_policy(self):
+        """パッケージのインポートでグローバルなイベントループポリシーを変更しないテスト"""
+        self.assertEqual(type(asyncio.get_event_loop_policy()).__module__.split(".")[0], "asyncio")
+    
+    def test_run_with_and_without_uvloop(self):
+        """use_uvloopの指定に応じたイベントループで実行するテスト"""
+        self.assertTrue(run_async(self._loop_module(), use_uvloop=False).startswith("asyncio"))
+        
+        try:
+            import uvloop  # noqa: F401
+        except ImportError:
+            self.skipTest("uvloop is not installed")
+        self.assertTrue(run_async(self._loop_module(), use_uvloop=True).startswith("uvloop"))
+        self.assertEqual(type(asyncio.get_event_loop_policy()).__module__.split(".")[0], "asyncio")
+    
+    def test_env_disables_uvloop(self):
+        """YTE_DISABLE_UVLOOPを呼び出し時に参照するテスト"""
+        with patch.dict(os.environ, {"YTE_DISABLE_UVLOOP": "1"}):
+            self.assertTrue(run_async(self._loop_module()).startswith("asyncio"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Tests for cache functionality
+"""
+
+import unittest
+import sys
+import os
+import gc
+import json
+import hashlib
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from unittest.mock import patch
+
+# パッケージのパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from youtube_transcript_extractor import (
+    TranscriptCache,
+    SQLiteTranscriptCache,
+    TranscriptResult,
+    TranscriptEntry,
+    TranscriptMethod,
+)
+
+
+def make_result(text: str = "Hello") -> TranscriptResult:
+    """テスト用の文字起こし結果を作成"""
+    return TranscriptResult(
+        entries=[TranscriptEntry(text, 0.0, 1.0)],
+        method=TranscriptMethod.INNERTUBE_API,
+        language="en",
+        success=True
+    )
+
+
+class TestTranscriptCache(unittest.TestCase):
+    """TranscriptCacheクラスのテスト"""
+    
+    def setUp(self):
+        """テスト用のキャッシュディレクトリを準備"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = TranscriptCache(self.cache_dir)
+    
+    def tearDown(self):
+        """キャッシュディレクトリを削除"""
+        self.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_shared_writer_thread(self):
+        """インスタンスを作成・破棄しても書き込みスレッドが増えずに解放されるテスト"""
+        refs = []
+        for i in range(10):
+            cache = TranscriptCache(self.cache_dir)
+            cache.set(f"video{i}", "en", make_result())
+            refs.append(weakref.ref(cache))
+        cache.flush()
+        del cache
+        gc.collect()
+        
+        writers = [t for t in threading.enumerate() if t.name == "TranscriptCacheWriter"]
+        self.assertEqual(len(writers), 1)
+        self.assertTrue(all(ref() is None for ref in refs))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 10)
+    
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(),
+        "fork is not available on this platform"
+    )
+    def test_write_after_fork(self):
+        """fork後の子プロセスでも書き込みスレッドを起動し直して保存できるテスト"""
+        # 親プロセスで書き込みスレッドを起動しておく
+        self.cache.set("parent", "en", make_result())
+        self.cache.flush()
+        
+        def child():
+            cache = TranscriptCache(self.cache_dir)
+            cache.set("child", "en", make_result("child"))
+            cache.flush()
+        
+        process = multiprocessing.get_context("fork").Process(target=child)
+        process.start()
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+            self.fail("flush() in the forked child did not return")
+        
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.cache.get("child", "en").to_plain_text(), "child")
+    
+    def test_get_expired_removed_concurrently(self):
+        """期限切れファイルが他で削除済みでもget()が例外を出さないテスト"""
+        cache = TranscriptCache(self.cache_dir, ttl_hours=0, memory_cache_size=0)
+        cache.set("video", "en", make_result())
+        cache.flush()
+        cache_path = cache._get_cache_path(cache._get_cache_key("video", "en"))
+        
+        real_remove = os.remove
+        
+        def remove_after_other(path):
+            real_remove(path)  # 別スレッドが先に削除した状況を再現
+            real_remove(path)
+        
+        with patch("os.remove", side_effect=remove_after_other):
+            self.assertIsNone(cache.get("video", "en"))
+        self.assertFalse(os.path.exists(cache_path))
+    
+    def test_clear_by_video_id_sees_other_instances(self):
+        """後から別インスタンスが書いたファイルもvideo_id指定で削除できるテスト"""
+        older = TranscriptCache(self.cache_dir)
+        self.cache.set("zzzzzzzzzzz", "en", make_result())
+        self.cache.flush()
+        
+        older.clear(video_id="zzzzzzzzzzz")
+        
+        self.assertEqual(os.listdir(self.cache_dir), [])
+    
+    def _write_and_path(self, result: TranscriptResult, video_id: str = "video", language: str = "en") -> str:
+        """メモリキャッシュを通さずに読めるよう保存し、ファイルパスを返す"""
+        self.cache.set(video_id, language, result)
+        self.cache.flush()
+        self.cache.close()
+        return self.cache._get_cache_path(self.cache._get_cache_key(video_id, language))
+    
+    def test_binary_round_trip(self):
+        """CJKテキストとprocessing_time=Noneを含む結果がそのまま復元されるテスト"""
+        result = TranscriptResult(
+            entries=[
+                TranscriptEntry("こんにちは、世界", 0.0, 1.5),
+                TranscriptEntry("你好 🌏", 1.5, 3.25),
+                TranscriptEntry("", 3.25, 4.0),
+            ],
+            method=TranscriptMethod.YOUTUBE_TRANSCRIPT_API,
+            language="ja",
+            success=True
+        )
+        self._write_and_path(result, video_id="動画", language="ja")
+        
+        loaded = self.cache.get("動画", "ja")
+        
+        self.assertEqual(loaded.entries, result.entries)
+        self.assertEqual(loaded.method, TranscriptMethod.YOUTUBE_TRANSCRIPT_API)
+        self.assertEqual(loaded.language, "ja")
+        self.assertIsNone(loaded.processing_time)
+        
+        result.processing_time = 1.25
+        self._write_and_path(result, video_id="動画", language="ja")
+        self.assertEqual(self.cache.get("動画", "ja").processing_time, 1.25)
+    
+    def test_result_language_survives_reload(self):
+        """要求と異なる言語で取得した結果の言語がディスクから読み直しても変わらないテスト"""
+        # "ja" を要求して英語トラックにフォールバックした結果
+        self._write_and_path(make_result(), language="ja")
+        
+        loaded = self.cache.get("video", "ja")
+        
+        self.assertEqual(loaded.language, "en")
+    
+    def test_truncated_file_removed(self):
+        """末尾が欠けたキャッシュファイルは読まずに削除されるテスト"""
+        cache_path = self._write_and_path(make_result("truncated"))
+        with open(cache_path, 'rb') as f:
+            payload = f.read()
+        for size in (len(payload) - 1, len(payload) - len("truncated")):
+            with self.subTest(size=size):
+                with open(cache_path, 'wb') as f:
+                    f.write(payload[:size])
+                
+                self.assertIsNone(self.cache.get("video", "en"))
+                self.assertFalse(os.path.exists(cache_path))
+    
+    def test_wrong_magic_removed(self):
+        """形式の異なるファイルは読まずに削除されるテスト"""
+        cache_path = self._write_and_path(make_result())
+        with open(cache_path, 'r+b') as f:
+            f.write(b'XXXX')
+        
+        self.assertIsNone(self.cache.get("video", "en"))
+        self.assertFalse(os.path.exists(cache_path))
+    
+    def test_zero_length_file(self):
+        """空のキャッシュファイルで例外が発生しないテスト"""
+        cache_path = self._write_and_path(make_result())
+        open(cache_path, 'wb').close()
+        
+        self.assertIsNone(self.cache.get("video", "en"))
+        self.assertFalse(os.path.exists(cache_path))
+    
+    def test_memory_cache_lru_eviction(self):
+        """上限を超えると最も長く使われていないエントリから破棄されるテスト"""
+        cache = TranscriptCache(self.cache_dir, memory_cache_size=2)
+        for video_id in ("v1", "v2"):
+            cache.set(video_id, "en", make_result(video_id))
+        cache.flush()
+        
+        cache.get("v1", "en")  # v1を最近使用したものにする
+        cache.set("v3", "en", make_result("v3"))
+        cache.flush()
+        
+        self.assertEqual(list(cache._mem), [("v1", "en"), ("v3", "en")])
+        # 破棄されたエントリはディスクから読み直される
+        self.assertEqual(cache.get("v2", "en").to_plain_text(), "v2")
+        self.assertEqual(list(cache._mem), [("v3", "en"), ("v2", "en")])
+    
+    def test_memory_cache_isolated_from_callers(self):
+        """保存元や取得した結果を変更してもメモリキャッシュの内容が変わらないテスト"""
+        result = make_result("Hello")
+        self.cache.set("video", "en", result)
+        result.entries.clear()
+        
+        first = self.cache.get("video", "en")
+        first.entries.clear()
+        first.language = "fr"
+        second = self.cache.get("video", "en")
+        
+        self.assertIsNot(first, second)
+        self.assertEqual(second.to_plain_text(), "Hello")
+        self.assertEqual(second.language, "en")
+    
+    def test_memory_cache_respects_ttl(self):
+        """メモリキャッシュ上のエントリも保存時刻からTTLを過ぎると返さないテスト"""
+        self.cache.set("video", "en", make_result())
+        self.cache.flush()
+        self.assertIsNotNone(self.cache.get("video", "en"))
+        
+        expired_at = time.time() + self.cache._ttl_seconds + 1
+        with patch("time.time", return_value=expired_at):
+            self.assertIsNone(self.cache.get("video", "en"))
+        self.assertNotIn(("video", "en"), self.cache._mem)
+    
+    def test_memory_cache_disabled(self):
+        """memory_cache_size=0ではメモリキャッシュを使わないテスト"""
+        cache = TranscriptCache(self.cache_dir, memory_cache_size=0)
+        cache.set("video", "en", make_result())
+        cache.flush()
+        
+        self.assertEqual(len(cache._mem), 0)
+        self.assertIsNotNone(cache.get("video", "en"))
+        self.assertEqual(len(cache._mem), 0)
+    
+    def test_clear_removes_legacy_json(self):
+        """旧形式（MD5ファイル名のJSON）のキャッシュも動画ID・言語指定で削除できるテスト"""
+        legacy_path = os.path.join(self.cache_dir, hashlib.md5(b"vid_en").hexdigest() + ".json")
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump({"video_id": "vid", "language": "en"}, f)
+        
+        self.cache.clear("vid", "en")
+        
+        self.assertFalse(os.path.exists(legacy_path))
+    
+    def test_clear_filters(self):
+        """video_id・languageによる絞り込み削除のテスト"""
+        for video_id in ("a__b", "v1"):
+            for language in ("ja", "en"):
+                self.cache.set(video_id, language, make_result())
+        self.cache.flush()
+        
+        self.cache.clear(video_id="a__b")
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ["v1__en.bin", "v1__ja.bin"])
+        
+        self.cache.clear(language="ja")
+        self.assertEqual(os.listdir(self.cache_dir), ["v1__en.bin"])
+        
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertIsNone(self.cache.get("v1", "en"))
+
+
+class TestSQLiteTranscriptCache(unittest.TestCase):
+    """SQLiteTranscriptCacheクラスのテスト"""
+    
+    def setUp(self):
+        """テスト用のキャッシュディレクトリを準備"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = SQLiteTranscriptCache(self.cache_dir)
+    
+    def tearDown(self):
+        """キャッシュディレクトリを削除"""
+        self.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_same_interface_as_file_cache(self):
+        """TranscriptCacheと同じメソッドとget_cache_infoのキーを持つテスト"""
+        for name in ("get", "set", "flush", "close", "clear", "cleanup_expired", "get_cache_info"):
+            with self.subTest(name=name):
+                self.assertTrue(callable(getattr(self.cache, name, None)))
+        
+        file_cache = TranscriptCache(self.cache_dir)
+        try:
+            self.assertLessEqual(set(file_cache.get_cache_info()), set(self.cache.get_cache_info()))
+        finally:
+            file_cache.close()
+    
+    def test_round_trip_and_clear(self):
+        """保存・取得・絞り込み削除のテスト"""
+        for video_id in ("v1", "v2"):
+            for language in ("ja", "en"):
+                self.cache.set(video_id, language, make_result(f"{video_id}-{language}"))
+        self.cache.flush()
+        
+        self.assertEqual(self.cache.get("v1", "ja").to_plain_text(), "v1-ja")
+        self.assertIsNone(self.cache.get("v3", "ja"))
+        
+        self.cache.clear(video_id="v1")
+        self.assertIsNone(self.cache.get("v1", "en"))
+        self.cache.clear(language="ja")
+        self.assertIsNone(self.cache.get("v2", "ja"))
+        self.assertIsNotNone(self.cache.get("v2", "en"))
+        
+        info = self.cache.get_cache_info()
+        self.assertEqual(info['total_files'], 1)
+        self.assertEqual(info['valid_files'], 1)
+        self.assertEqual(info['cache_dir'], self.cache_dir)
+    
+    def test_expired_and_corrupted_entries(self):
+        """期限切れ・破損したエントリを返さず、統計で期限切れとして数えるテスト"""
+        self.cache.set("old", "en", make_result())
+        self.cache.set("broken", "en", make_result())
+        with self.cache._lock:
+            self.cache._conn.execute("UPDATE transcripts SET ts = 0 WHERE video_id = 'old'")
+            self.cache._conn.execute("UPDATE transcripts SET payload = x'00' WHERE video_id = 'broken'")
+            self.cache._conn.commit()
+        
+        self.assertEqual(self.cache.get_cache_info()['expired_files'], 1)
+        self.assertEqual(self.cache.get_cache_info(deep=True)['expired_files'], 2)
+        
+        self.assertIsNone(self.cache.get("old", "en"))
+        self.assertIsNone(self.cache.get("broken", "en"))
+        self.assertEqual(self.cache.get_cache_info()['total_files'], 0)
+    
+    def test_result_language_survives_reload(self):
+        """要求と異なる言語で取得した結果の言語を保存するテスト"""
+        self.cache.set("video", "ja", make_result())
+        
+        self.assertEqual(self.cache.get("video", "ja").language, "en")
+    
+    def test_set_ignores_unserializable_result(self):
+        """シリアライズできない結果の保存で例外が発生しないテスト"""
+        result = make_result()
+        result.processing_time = object()
+        
+        self.cache.set("video", "en", result)
+        
+        self.assertIsNone(self.cache.get("video", "en"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,11 @@ Tests for core functionality
 import unittest
 import sys
 import os
+import time
+import pickle
+import tempfile
+import threading
+from dataclasses import fields
 from unittest.mock import Mock, patch
 
 # パッケージのパスを追加
@@ -35,6 +40,15 @@ class TestTranscriptEntry(unittest.TestCase):
         self.assertEqual(entry.start_time, 10.5)
         self.assertEqual(entry.end_time, 15.2)
     
+    def test_immutable(self):
+        """エントリが不変であることのテスト"""
+        entry = TranscriptEntry("Hello", 0.0, 2.0)
+        
+        with self.assertRaises(AttributeError):
+            entry.text = "changed"
+        
+        self.assertEqual(pickle.loads(pickle.dumps(entry)), entry)
+    
     def test_to_dict(self):
         """to_dictメソッドのテスト"""
         entry = TranscriptEntry(
@@ -75,6 +89,37 @@ class TestTranscriptResult(unittest.TestCase):
         expected = "Hello world test"
         self.assertEqual(self.result.to_plain_text(), expected)
     
+    def test_to_plain_text_after_entries_change(self):
+        """エントリの置き換え・追加・リスト差し替え後に古いテキストを返さないテスト"""
+        self.assertEqual(self.result.to_plain_text(), "Hello world test")
+        
+        self.result.entries[0] = TranscriptEntry("Goodbye", 0.0, 2.0)
+        self.assertEqual(self.result.to_plain_text(), "Goodbye world test")
+        
+        self.result.entries.append(TranscriptEntry("again", 6.0, 8.0))
+        self.assertEqual(self.result.to_plain_text(), "Goodbye world test again")
+        
+        self.result.entries = [TranscriptEntry("New", 0.0, 1.0)]
+        self.assertEqual(self.result.to_plain_text(), "New")
+        
+        # 内部状態をdataclassのフィールドとして持たない
+        self.assertEqual(
+            [f.name for f in fields(TranscriptResult)],
+            ["entries", "method", "language", "success", "error_message", "processing_time"]
+        )
+    
+    def test_total_text_length(self):
+        """total_text_lengthプロパティのテスト"""
+        self.assertEqual(self.result.total_text_length, len(self.result.to_plain_text()))
+        
+        empty_result = TranscriptResult(
+            entries=[],
+            method=TranscriptMethod.INNERTUBE_API,
+            language="en",
+            success=False
+        )
+        self.assertEqual(empty_result.total_text_length, 0)
+    
     def test_to_srt(self):
         """to_srtメソッドのテスト"""
         srt_content = self.result.to_srt()
@@ -92,6 +137,9 @@ class TestTranscriptResult(unittest.TestCase):
         
         formatted = self.result._format_srt_time(0.123)
         self.assertEqual(formatted, "00:00:00,123")
+        
+        formatted = self.result._format_srt_time(2687.285)
+        self.assertEqual(formatted, "00:44:47,285")
 
 
 class TestTranscriptConfig(unittest.TestCase):
@@ -145,6 +193,7 @@ class TestYouTubeTranscriptExtractor(unittest.TestCase):
             ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
             ("https://www.youtube.com/embed/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
             ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10s", "dQw4w9WgXcQ"),
+            ("https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
         ]
         
         for url, expected_id in test_cases:
@@ -158,6 +207,8 @@ class TestYouTubeTranscriptExtractor(unittest.TestCase):
             "https://example.com/video",
             "not_a_url",
             "https://vimeo.com/123456",
+            "https://www.youtube.com/watch?v=short",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQabc",
             ""
         ]
         
@@ -182,6 +233,162 @@ class TestYouTubeTranscriptExtractor(unittest.TestCase):
         config = TranscriptConfig(preferred_language="fr")
         extractor = YouTubeTranscriptExtractor(config)
         self.assertEqual(extractor.config.preferred_language, "fr")
+    
+    def test_hedged_fallback(self):
+        """応答の遅い手法を待たずに次の手法の結果を返すテスト"""
+        extractor = YouTubeTranscriptExtractor(TranscriptConfig(hedge_delay=0.05, enable_cache=False))
+        
+        def slow_extract(video_id, language):
+            time.sleep(1.0)
+            return TranscriptResult([], TranscriptMethod.INNERTUBE_API, language, False, "timeout")
+        
+        fast_result = TranscriptResult(
+            [TranscriptEntry("Hello", 0.0, 1.0)],
+            TranscriptMethod.YOUTUBE_TRANSCRIPT_API, "en", True
+        )
+        extractor.extractors[TranscriptMethod.INNERTUBE_API] = Mock(extract=Mock(side_effect=slow_extract))
+        extractor.extractors[TranscriptMethod.YOUTUBE_TRANSCRIPT_API] = Mock(extract=Mock(return_value=fast_result))
+        
+        start = time.time()
+        result = extractor.get_transcript("dQw4w9WgXcQ")
+        
+        self.assertTrue(result.success)
+        self.assertEqual(result.method, TranscriptMethod.YOUTUBE_TRANSCRIPT_API)
+        self.assertLess(time.time() - start, 0.5)
+    
+    def test_costly_method_not_hedged(self):
+        """有料の手法は並行開始せず、先行する手法が失敗してから開始するテスト"""
+        extractor = YouTubeTranscriptExtractor(TranscriptConfig(
+            hedge_delay=0.01,
+            enable_cache=False,
+            fallback_methods=[TranscriptMethod.INNERTUBE_API, TranscriptMethod.OPENAI_WHISPER]
+        ))
+        events = []
+        
+        def slow_extract(success):
+            def extract(video_id, language):
+                time.sleep(0.1)
+                events.append("innertube")
+                return TranscriptResult(
+                    [TranscriptEntry("Hello", 0.0, 1.0)] if success else [],
+                    TranscriptMethod.INNERTUBE_API, language, success
+                )
+            return extract
+        
+        def whisper_extract(video_id, language):
+            events.append("whisper")
+            return TranscriptResult([TranscriptEntry("Hello", 0.0, 1.0)], TranscriptMethod.OPENAI_WHISPER, language, True)
+        
+        whisper = Mock(extract=Mock(side_effect=whisper_extract))
+        extractor.extractors[TranscriptMethod.OPENAI_WHISPER] = whisper
+        
+        with extractor:
+            extractor.extractors[TranscriptMethod.INNERTUBE_API] = Mock(extract=Mock(side_effect=slow_extract(True)))
+            result = extractor.get_transcript("dQw4w9WgXcQ")
+            self.assertEqual(result.method, TranscriptMethod.INNERTUBE_API)
+            self.assertEqual(whisper.extract.call_count, 0)
+            
+            extractor.extractors[TranscriptMethod.INNERTUBE_API] = Mock(extract=Mock(side_effect=slow_extract(False)))
+            result = extractor.get_transcript("dQw4w9WgXcQ")
+            self.assertEqual(result.method, TranscriptMethod.OPENAI_WHISPER)
+        
+        self.assertEqual(events, ["innertube", "innertube", "whisper"])
+    
+    def test_close_shuts_down_executor(self):
+        """close()でスレッドプールを停止し、再利用時は作り直すテスト"""
+        extractor = YouTubeTranscriptExtractor(TranscriptConfig(enable_cache=False))
+        executor = extractor._get_executor()
+        
+        extractor.close()
+        
+        with self.assertRaises(RuntimeError):
+            executor.submit(time.time)
+        self.assertIsNot(extractor._get_executor(), executor)
+        extractor.close()
+    
+    def test_cache_hit(self):
+        """キャッシュ済みの結果を抽出器を呼ばずに返すテスト"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            extractor = YouTubeTranscriptExtractor(TranscriptConfig(cache_dir=cache_dir))
+            result = TranscriptResult(
+                [TranscriptEntry("Hello", 0.0, 1.0)],
+                TranscriptMethod.INNERTUBE_API, "en", True
+            )
+            mock_extractor = Mock(extract=Mock(return_value=result))
+            extractor.extractors = {TranscriptMethod.INNERTUBE_API: mock_extractor}
+            extractor.config.fallback_methods = [TranscriptMethod.INNERTUBE_API]
+            
+            first = extractor.get_transcript("dQw4w9WgXcQ")
+            extractor._get_cache().flush()
+            
+            # 新しいインスタンスでもディスク上のキャッシュから取得できる
+            other = YouTubeTranscriptExtractor(TranscriptConfig(cache_dir=cache_dir))
+            other.extractors = {}
+            second = other.get_transcript("dQw4w9WgXcQ")
+            
+            self.assertTrue(first.success)
+            self.assertTrue(second.success)
+            self.assertEqual(second.to_plain_text(), "Hello")
+            self.assertEqual(mock_extractor.extract.call_count, 1)
+            
+            # 呼び出し元が結果を変更しても、以降のキャッシュヒットには影響しない
+            first.entries.clear()
+            third = extractor.get_transcript("dQw4w9WgXcQ")
+            self.assertIsNot(third, first)
+            self.assertEqual(third.to_plain_text(), "Hello")
+    
+    def test_get_transcripts(self):
+        """複数動画の並行取得テスト（入力順を保持し、例外は要素として返す）"""
+        extractor = YouTubeTranscriptExtractor(TranscriptConfig(enable_cache=False))
+        result = TranscriptResult(
+            [TranscriptEntry("Hello", 0.0, 1.0)],
+            TranscriptMethod.INNERTUBE_API, "en", True
+        )
+        extractor.extractors = {TranscriptMethod.INNERTUBE_API: Mock(extract=Mock(return_value=result))}
+        extractor.config.fallback_methods = [TranscriptMethod.INNERTUBE_API]
+        
+        results = extractor.get_transcripts(["dQw4w9WgXcQ", "https://example.com/video", "https://youtu.be/jNQXAC9IVRw"])
+        
+        self.assertEqual(len(results), 3)
+        self.assertTrue(results[0].success)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertTrue(results[2].success)
+    
+    def test_fallback_all_failed(self):
+        """すべての手法が失敗した場合のテスト"""
+        extractor = YouTubeTranscriptExtractor(TranscriptConfig(enable_cache=False))
+        for method in extractor.config.fallback_methods:
+            extractor.extractors[method] = Mock(extract=Mock(side_effect=Exception("error")))
+        
+        result = extractor.get_transcript("dQw4w9WgXcQ")
+        
+        self.assertFalse(result.success)
+        self.assertEqual(result.error_message, "All extraction methods failed")
+    
+    def test_lazy_resources_created_once(self):
+        """複数スレッドから同時に初回使用してもキャッシュとスレッドプールが1つだけ作成されるテスト"""
+        def slow_factory(*args, **kwargs):
+            time.sleep(0.05)  # 作成中に他のスレッドが割り込める状況を再現
+            return Mock()
+        
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch("youtube_transcript_extractor.core.ThreadPoolExecutor", side_effect=slow_factory) as executor_class, \
+                patch("youtube_transcript_extractor.cache.TranscriptCache", side_effect=slow_factory) as cache_class:
+            extractor = YouTubeTranscriptExtractor(TranscriptConfig(cache_dir=cache_dir))
+            barrier = threading.Barrier(8)
+            
+            def first_use():
+                barrier.wait()
+                return extractor._get_executor(), extractor._get_cache()
+            
+            threads = [threading.Thread(target=first_use) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(executor_class.call_count, 1)
+        self.assertEqual(cache_class.call_count, 1)
 
 
 class TestIntegration(unittest.TestCase):
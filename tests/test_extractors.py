@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for extractor helpers
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+from unittest.mock import Mock, patch
+
+import orjson
+
+# パッケージのパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from youtube_transcript_extractor import (
+    InnerTubeAPIExtractor,
+    TranscriptConfig,
+    TranscriptEntry,
+)
+
+WATCH_HTML = b'<script>ytcfg.set({"INNERTUBE_API_KEY":"KEY1","OTHER":1});</script>'
+
+TRACKS = [
+    {"languageCode": "ja", "baseUrl": "https://www.youtube.com/api/timedtext?v=x&lang=ja&fmt=srv3"},
+    {"languageCode": "en", "baseUrl": "https://www.youtube.com/api/timedtext?v=x&lang=en"},
+    {"languageCode": "en", "baseUrl": "https://www.youtube.com/api/timedtext?v=x&lang=en&kind=asr"},
+]
+
+CAPTION_XML = (
+    b'<?xml version="1.0" encoding="utf-8" ?><transcript>'
+    b'<text start="0.5" dur="1.25">Tom &amp;amp; Jerry</text>'
+    b'<text start="1.75">&lt;b&gt;no dur&lt;/b&gt;</text>'
+    b'<text start="3" dur="2"></text>'
+    b'</transcript>'
+)
+
+
+def make_response(status_code: int = 200, content: bytes = b"") -> Mock:
+    """requests.Responseのスタブを作成"""
+    response = Mock(status_code=status_code, content=content)
+    if status_code >= 400:
+        response.raise_for_status.side_effect = Exception(f"HTTP {status_code}")
+    return response
+
+
+def player_response(tracks=TRACKS) -> bytes:
+    """player APIのレスポンス本文を作成"""
+    return orjson.dumps({"captions": {"playerCaptionsTracklistRenderer": {"captionTracks": tracks}}})
+
+
+class TestInnerTubeHelpers(unittest.TestCase):
+    """InnerTube API用ヘルパーのテスト"""
+    
+    def test_parse_caption_xml(self):
+        """HTMLエンティティのデコードとdur省略時の終了時刻のテスト"""
+        entries = InnerTubeAPIExtractor._parse_caption_xml(CAPTION_XML)
+        
+        self.assertEqual(entries, [
+            TranscriptEntry("Tom & Jerry", 0.5, 1.75),
+            TranscriptEntry("<b>no dur</b>", 1.75, 1.75),
+            TranscriptEntry("", 3.0, 5.0),
+        ])
+    
+    def test_find_api_key(self):
+        """動画ページの各形式からAPIキーを抽出するテスト"""
+        cases = [
+            (WATCH_HTML, "KEY1"),
+            (b'{"innertubeApiKey":"KEY2"}', "KEY2"),
+            (b"var cfg = {INNERTUBE_API_KEY: KEY3, x: 1}", "KEY3"),
+            (b"<html>no key</html>", None),
+        ]
+        
+        for html, expected in cases:
+            with self.subTest(html=html):
+                self.assertEqual(InnerTubeAPIExtractor._find_api_key(html), expected)
+    
+    def test_select_track(self):
+        """指定言語 → 英語 → 先頭の順で、同じ言語なら先に現れたトラックを選ぶテスト"""
+        select = InnerTubeAPIExtractor._select_track
+        
+        self.assertIs(select(TRACKS, "ja"), TRACKS[0])
+        self.assertIs(select(TRACKS, "en"), TRACKS[1])
+        self.assertIs(select(TRACKS, "fr"), TRACKS[1])
+        self.assertIs(select(TRACKS[:1], "fr"), TRACKS[0])
+        self.assertEqual(InnerTubeAPIExtractor._caption_url(TRACKS[0]), "https://www.youtube.com/api/timedtext?v=x&lang=ja")
+
+
+class TestInnerTubeAPIKeyCache(unittest.TestCase):
+    """APIキーのプロセス内キャッシュのテスト"""
+    
+    def setUp(self):
+        """キャッシュを空にし、通信をスタブに差し替えた抽出器を準備"""
+        InnerTubeAPIExtractor._cached_api_key = None
+        self.addCleanup(setattr, InnerTubeAPIExtractor, "_cached_api_key", None)
+        
+        self.extractor = InnerTubeAPIExtractor(TranscriptConfig())
+        self.extractor.session = Mock()
+        self.extractor.session.get.side_effect = self._get
+        self.player_statuses = {}
+        self.extractor.session.post.side_effect = self._post
+        self.watch_fetches = 0
+    
+    def _get(self, url, **kwargs):
+        """動画ページとキャプションXMLのスタブ"""
+        if url.startswith("https://www.youtube.com/watch"):
+            self.watch_fetches += 1
+            time.sleep(0.02)  # 取得中に他のスレッドが割り込める状況を再現
+            return make_response(content=WATCH_HTML.replace(b"KEY1", f"KEY{self.watch_fetches}".encode()))
+        return make_response(content=CAPTION_XML)
+    
+    def _post(self, url, **kwargs):
+        """player APIのスタブ（キーごとにステータスを指定できる）"""
+        api_key = url.rsplit("key=", 1)[1]
+        return make_response(self.player_statuses.get(api_key, 200), player_response())
+    
+    def test_key_reused_until_ttl(self):
+        """キャッシュしたキーを有効期間内は再利用し、期限切れ後は取り直すテスト"""
+        self.assertTrue(self.extractor.extract("video1", "en").success)
+        self.assertTrue(self.extractor.extract("video2", "en").success)
+        self.assertEqual(self.watch_fetches, 1)
+        
+        expired_at = time.time() + InnerTubeAPIExtractor.API_KEY_TTL_SECONDS + 1
+        with patch("youtube_transcript_extractor.extractors.time.time", return_value=expired_at):
+            self.assertTrue(self.extractor.extract("video3", "en").success)
+        self.assertEqual(self.watch_fetches, 2)
+    
+    def test_rejected_key_refetched_once(self):
+        """キャッシュしたキーが拒否されたら一度だけ取り直して再試行するテスト"""
+        self.extractor.extract("video1", "en")
+        self.player_statuses = {"KEY1": 403}
+        
+        result = self.extractor.extract("video2", "en")
+        
+        self.assertTrue(result.success)
+        self.assertEqual(self.watch_fetches, 2)
+        self.assertEqual(InnerTubeAPIExtractor._get_cached_api_key(), "KEY2")
+        
+        # 取り直したキーも拒否される場合は再試行を繰り返さない
+        self.player_statuses = {"KEY2": 403, "KEY3": 403}
+        self.assertFalse(self.extractor.extract("video3", "en").success)
+        self.assertEqual(self.watch_fetches, 3)
+    
+    def test_fresh_key_not_retried(self):
+        """取得したばかりのキーが拒否された場合は再試行しないテスト"""
+        self.player_statuses = {"KEY1": 403}
+        
+        self.assertFalse(self.extractor.extract("video1", "en").success)
+        self.assertEqual(self.watch_fetches, 1)
+    
+    def test_invalidate_only_if_unchanged(self):
+        """他で更新済みのキーは、古いキーの拒否によって破棄されないテスト"""
+        InnerTubeAPIExtractor._store_api_key("NEW")
+        InnerTubeAPIExtractor._invalidate_api_key("OLD")
+        self.assertEqual(InnerTubeAPIExtractor._get_cached_api_key(), "NEW")
+        
+        InnerTubeAPIExtractor._invalidate_api_key("NEW")
+        self.assertIsNone(InnerTubeAPIExtractor._get_cached_api_key())
+    
+    def test_single_flight_on_cold_cache(self):
+        """同時にキャッシュミスしても動画ページは1回だけ取得するテスト"""
+        barrier = threading.Barrier(8)
+        results = []
+        
+        def extract():
+            barrier.wait()
+            results.append(self.extractor.extract("video", "en"))
+        
+        threads = [threading.Thread(target=extract) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(self.watch_fetches, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()